@@ -1,21 +1,59 @@
 import os
 import sqlite3
 import json
-import traceback 
+import logging
+import asyncio
+import hashlib
+import random
+import re
+import secrets
+import string
+import threading
+import time
+from textwrap import dedent
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
-from flask import Flask, render_template, request, jsonify, g, redirect, url_for, session
+from flask import Flask, render_template, request, jsonify, g, redirect, url_for, session, Response, stream_with_context
+from markupsafe import escape
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+import httpx
 import math
+import numpy as np
+
+# Optional fast JSON codec; falls back to stdlib json when unavailable
+try:
+    import orjson
+
+    def _json_loads(s):
+        return orjson.loads(s)
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+# Optional fast hash for response ETags; falls back to blake2b
+try:
+    import xxhash
+
+    def _etag_digest(body):
+        return xxhash.xxh64_hexdigest(body)
+except ImportError:
+    def _etag_digest(body):
+        return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+logger = logging.getLogger(__name__)
 
 # Optional WHOOP integration
 try:
     import requests
     WHOOP_AVAILABLE = True
+    # Shared session so repeated WHOOP calls reuse keep-alive connections
+    WHOOP_SESSION = requests.Session()
 except ImportError:
     WHOOP_AVAILABLE = False
-    print("Warning: requests module not available. WHOOP integration will be disabled.")
+    WHOOP_SESSION = None
+    logger.warning("requests module not available; WHOOP integration will be disabled")
 
 # Prefer class-based parser if available; fall back to module-level parse()
 try:
@@ -29,6 +67,29 @@ except Exception:  # pragma: no cover
 load_dotenv()
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
+
+if orjson is not None:
+    from flask.json.provider import DefaultJSONProvider
+
+    class _OrjsonProvider(DefaultJSONProvider):
+        """JSON provider backed by orjson.
+
+        Routes request.get_json() and jsonify() through orjson, which
+        parses the nested fitness_profile/calibration payloads sent to
+        /calibrate and /generate_personalized_workout noticeably faster
+        than stdlib json.
+        """
+
+        @staticmethod
+        def loads(s, **kwargs):
+            return orjson.loads(s)
+
+        @staticmethod
+        def dumps(obj, **kwargs):
+            return orjson.dumps(obj, default=DefaultJSONProvider.default).decode()
+
+    app.json = _OrjsonProvider(app)
+
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'your-secret-key-here')
 DATABASE = 'workouts.db'
 
@@ -80,6 +141,188 @@ def validate_days_parameter(days_str, default=30):
     except (ValueError, TypeError):
         return default
 
+# Cached OpenAI client: constructing a client per request throws away its
+# httpx connection pool, paying a fresh TLS handshake on every generation.
+_OPENAI_CLIENT = None
+_OPENAI_CLIENT_KEY = None
+
+def _get_openai(api_key):
+    """Return a shared OpenAI client whose keep-alive pool spans requests."""
+    global _OPENAI_CLIENT, _OPENAI_CLIENT_KEY
+    if _OPENAI_CLIENT is None or _OPENAI_CLIENT_KEY != api_key:
+        _OPENAI_CLIENT = OpenAI(
+            api_key=api_key,
+            http_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=20)),
+        )
+        _OPENAI_CLIENT_KEY = api_key
+    return _OPENAI_CLIENT
+
+# Async OpenAI plumbing: the Flask handlers stay sync, but the HTTPS
+# round-trip runs on a persistent asyncio loop in a background thread, so
+# several users' generations overlap instead of each pinning a worker for
+# the full multi-second OpenAI call.
+_ASYNC_LOOP = None
+_ASYNC_LOOP_LOCK = threading.Lock()
+_ASYNC_CLIENT = None
+_ASYNC_CLIENT_KEY = None
+
+# wsgi.py monkey-patches the stdlib with eventlet before importing this
+# module. In that process "threads" are greenthreads and asyncio on a
+# patched stdlib is unsupported, so the background loop must never start
+# there: the OpenAI helpers below fall back to the sync client, whose
+# blocking sockets eventlet already makes cooperative.
+try:
+    from eventlet import patcher as _eventlet_patcher
+    _EVENTLET_PATCHED = _eventlet_patcher.is_monkey_patched("thread")
+except ImportError:
+    _EVENTLET_PATCHED = False
+
+def _ensure_async_loop():
+    """Start (once) and return the shared background event loop."""
+    global _ASYNC_LOOP
+    with _ASYNC_LOOP_LOCK:
+        if _ASYNC_LOOP is None:
+            _ASYNC_LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_ASYNC_LOOP.run_forever,
+                             name="openai-loop", daemon=True).start()
+    return _ASYNC_LOOP
+
+def _get_async_openai(api_key):
+    """Return a shared AsyncOpenAI client, rebuilt only if the key changes."""
+    global _ASYNC_CLIENT, _ASYNC_CLIENT_KEY
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT_KEY != api_key:
+        _ASYNC_CLIENT = AsyncOpenAI(api_key=api_key)
+        _ASYNC_CLIENT_KEY = api_key
+    return _ASYNC_CLIENT
+
+def _chat_completion(api_key, **kwargs):
+    """Run a chat completion on the background loop and wait for the result."""
+    if _EVENTLET_PATCHED:
+        return _get_openai(api_key).chat.completions.create(**kwargs)
+    future = asyncio.run_coroutine_threadsafe(
+        _get_async_openai(api_key).chat.completions.create(**kwargs),
+        _ensure_async_loop(),
+    )
+    return future.result()
+
+def _ndjson_line(obj):
+    """Serialize one NDJSON line (bytes, newline-terminated)."""
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj) + "\n").encode()
+
+def _stream_generation(api_key, messages, finalize):
+    """Stream a workout generation as NDJSON instead of buffering it.
+
+    Yields {"delta": ...} lines as OpenAI tokens arrive, then a final
+    {"_done": true, "workout": ...} line once the object parses. Uses the
+    sync client: a streamed response is consumed incrementally here, so the
+    background-loop future pattern does not apply.
+    """
+    client = _get_openai(api_key)
+
+    def gen():
+        parts = []
+        try:
+            stream = client.chat.completions.create(
+                model="gpt-4o-mini",
+                response_format={"type": "json_object"},
+                messages=messages,
+                temperature=0.7,
+                max_tokens=1500,
+                stream=True,
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield _ndjson_line({"delta": delta})
+        except Exception:
+            # A failure mid-stream must still terminate the NDJSON stream:
+            # emit the error as the final line instead of truncating it and
+            # leaving the client hanging on a half-stream.
+            logger.exception("Error while streaming workout generation")
+            yield _ndjson_line({"_done": True, "error": "Failed to generate workout"})
+            return
+        response_text = "".join(parts).strip()
+        try:
+            workout_json = _json_loads(response_text)
+        except ValueError:
+            json_str = _extract_json_object(response_text)
+            workout_json = _json_loads(json_str) if json_str else None
+        if workout_json:
+            yield _ndjson_line({"_done": True, "workout": finalize(workout_json)})
+        else:
+            yield _ndjson_line({"_done": True, "error": "Failed to generate structured workout"})
+
+    return Response(stream_with_context(gen()), mimetype='application/x-ndjson')
+
+# Compiled once: re.search with a literal pattern pays the regex-cache
+# lookup on every request.
+_JSON_OBJ_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Duration parsing for the /generate_* routes: one compiled scan instead of
+# up to ten substring checks. Listing "forty[- ]five" before "forty" also
+# fixes the old chain matching "forty" first in "forty-five minutes".
+_DUR_RE = re.compile(r'\b(20|30|40|45|60|twenty|thirty|forty[- ]five|forty|sixty)\b', re.I)
+_DUR_MAP = {
+    '20': 20, 'twenty': 20,
+    '30': 30, 'thirty': 30,
+    '40': 40, 'forty': 40,
+    '45': 45, 'forty-five': 45, 'forty five': 45,
+    '60': 60, 'sixty': 60,
+}
+
+def _parse_duration(user_request, default=30):
+    """Extract a workout duration in minutes from free-text, or default."""
+    m = _DUR_RE.search(user_request)
+    return _DUR_MAP[m.group(1).lower()] if m else default
+
+def _extract_json_object(s):
+    """Return the first balanced {...} object in s, or None.
+
+    Single forward scan tracking brace depth and string literals — O(n) with
+    no regex backtracking across the whole model reply.
+    """
+    start = s.find('{')
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(s)):
+        ch = s[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return s[start:i + 1]
+    return None
+
+# Helper for polled JSON routes: tag the body with an ETag so clients that
+# already hold the current payload get an empty 304 instead of the full JSON
+def _conditional_json(payload):
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload).encode()
+    etag = _etag_digest(body)
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304
+    resp = Response(body, mimetype='application/json')
+    resp.headers['ETag'] = etag
+    return resp
+
 # WHOOP API Configuration
 WHOOP_CLIENT_ID = os.getenv('WHOOP_CLIENT_ID')
 WHOOP_CLIENT_SECRET = os.getenv('WHOOP_CLIENT_SECRET', '43d8c7a606083d063e422454bd593104fd66e1716b3900ff86d8752e87769db0')
@@ -87,14 +330,11 @@ WHOOP_REDIRECT_URI = os.getenv('WHOOP_REDIRECT_URI', 'https://workout-timer-dskb
 WHOOP_API_BASE = 'https://api.prod.whoop.com'
 WHOOP_API_BASE_V1 = 'https://api.prod.whoop.com/developer/v1'
 
-# Debug: Print the actual values being used
-print(f"=== WHOOP CONFIG DEBUG ===")
-print(f"WHOOP_CLIENT_ID: {WHOOP_CLIENT_ID}")
-print(f"WHOOP_CLIENT_SECRET: {WHOOP_CLIENT_SECRET}")
-print(f"WHOOP_REDIRECT_URI: {WHOOP_REDIRECT_URI}")
-print(f"Client Secret Length: {len(WHOOP_CLIENT_SECRET) if WHOOP_CLIENT_SECRET else 0}")
-print(f"Expected Length: 64")
-print(f"=== END WHOOP CONFIG DEBUG ===")
+# Debug: log the config being used (secret by length only, never its value)
+logger.debug("WHOOP client id: %s", WHOOP_CLIENT_ID)
+logger.debug("WHOOP redirect uri: %s", WHOOP_REDIRECT_URI)
+logger.debug("WHOOP client secret length: %s (expected 64)",
+             len(WHOOP_CLIENT_SECRET) if WHOOP_CLIENT_SECRET else 0)
 
 # ==================== HEART RATE ZONES ====================
 
@@ -154,11 +394,11 @@ class WHOOPHeartRateBroadcast:
                 headers=headers
             )
             if response.status_code == 200:
-                print("WHOOP HR broadcast started")
+                logger.debug("WHOOP HR broadcast started")
                 return True
             return False
-        except Exception as e:
-            print(f"Error starting HR broadcast: {e}")
+        except Exception:
+            logger.exception("Error starting HR broadcast")
             return False
     
     def stop_broadcast(self) -> bool:
@@ -170,8 +410,8 @@ class WHOOPHeartRateBroadcast:
                 headers=headers
             )
             return response.status_code == 200
-        except Exception as e:
-            print(f"Error stopping HR broadcast: {e}")
+        except Exception:
+            logger.exception("Error stopping HR broadcast")
             return False
     
     def get_current_hr(self) -> Dict:
@@ -193,8 +433,8 @@ class WHOOPHeartRateBroadcast:
                 self.hr_history = self.hr_history[-60:]
                 return data
             return {'heart_rate': 0}
-        except Exception as e:
-            print(f"Error getting current HR: {e}")
+        except Exception:
+            logger.exception("Error getting current HR")
             return {'heart_rate': 0}
 
 # ==================== DYNAMIC ZONE-BASED WORKOUT ====================
@@ -433,14 +673,16 @@ def init_db():
 
 def parse_intervals(text: str):
     """Parse workout text using the best available parser variant."""
+    # The parser returns compact Interval records; convert to dicts here,
+    # where the rest of the app expects key access.
     if WorkoutParser is not None:
         try:
-            return WorkoutParser().parse_chatgpt_workout(text)
+            return [iv._asdict() for iv in WorkoutParser().parse_chatgpt_workout(text)]
         except Exception:
             pass
     # Fallback to module-level parser if present
     try:
-        return workout_parser.parse(text)  # type: ignore[name-defined]
+        return [iv._asdict() for iv in workout_parser.parse(text)]  # type: ignore[name-defined]
     except Exception:
         return []
 
@@ -448,43 +690,43 @@ def generate_workout_text_from_intervals(intervals):
     """Generate workout text from intervals with calculated section durations"""
     if not intervals:
         return ""
-    
-    result = ""
+
+    # Collect f-string lines and join once at the end; repeated += on str
+    # re-copies the whole buffer every iteration.
+    parts = []
+
+    def _append_section(section, section_intervals):
+        section_duration = sum(si.get('duration_min', 0) for si in section_intervals)
+        parts.append(f"**{section} – {section_duration} minutes**")
+        for si in section_intervals:
+            description = si.get('description', '')
+            incline = si.get('incline', 0)
+            incline_text = f", incline {incline}" if incline else ""
+            desc_text = f" ({description})" if description else ""
+            parts.append(f"* {si.get('duration_min', 0)} min @ {si.get('speed_mph', 0)} mph{incline_text}{desc_text}")
+        parts.append("")  # blank line between sections
+
     current_section = ""
     section_intervals = []
-    
+
     for interval in intervals:
         section = interval.get('section', 'Workout')
-        
+
         if section != current_section:
             # Write previous section if exists
             if section_intervals:
-                section_duration = sum(si.get('duration_min', 0) for si in section_intervals)
-                result += f"**{current_section} – {section_duration} minutes**\n"
-                for si in section_intervals:
-                    description = si.get('description', '')
-                    incline = si.get('incline', 0)
-                    incline_text = f", incline {incline}" if incline else ""
-                    result += f"* {si.get('duration_min', 0)} min @ {si.get('speed_mph', 0)} mph{incline_text}{' (' + description + ')' if description else ''}\n"
-                result += "\n"
-            
+                _append_section(current_section, section_intervals)
             # Start new section
             current_section = section
             section_intervals = [interval]
         else:
             section_intervals.append(interval)
-    
+
     # Write final section
     if section_intervals:
-        section_duration = sum(si.get('duration_min', 0) for si in section_intervals)
-        result += f"**{current_section} – {section_duration} minutes**\n"
-        for si in section_intervals:
-            description = si.get('description', '')
-            incline = si.get('incline', 0)
-            incline_text = f", incline {incline}" if incline else ""
-            result += f"* {si.get('duration_min', 0)} min @ {si.get('speed_mph', 0)} mph{incline_text}{' (' + description + ')' if description else ''}\n"
-    
-    return result.strip()
+        _append_section(current_section, section_intervals)
+
+    return "\n".join(parts).strip()
 
 @app.route("/")
 def index():
@@ -500,8 +742,6 @@ def privacy_policy():
 
 @app.route("/workout_suggestions")
 def workout_suggestions():
-    import random
-    from datetime import datetime
     
     # Get query parameters for category and duration
     category = request.args.get('category', 'endurance')
@@ -672,7 +912,7 @@ def generate_workout():
     try:
         # Check API key
         api_key = os.environ.get("OPENAI_API_KEY")
-        print(f"API Key present: {bool(api_key)}")  # debug log
+        logger.debug("API Key present: %s", bool(api_key))
         if not api_key:
             return jsonify(success=False, error="OpenAI API key not configured"), 500
 
@@ -684,16 +924,9 @@ def generate_workout():
 
         # Call OpenAI with structured approach
         try:
-            import random
-            from datetime import datetime
             
-            # Initialize OpenAI client with minimal parameters to avoid proxy issues
-            try:
-                client = OpenAI(api_key=api_key)
-            except Exception as client_error:
-                print(f"OpenAI client init error: {client_error}")
-                # Try alternative initialization
-                client = OpenAI(api_key=api_key, base_url="https://api.openai.com/v1")
+            # Reuse the shared OpenAI client (keeps the TLS pool warm)
+            client = _get_openai(api_key)
             
             # Athlete Profile (personalized for the user)
             athlete_profile = """
@@ -778,17 +1011,7 @@ def generate_workout():
             """
 
             # Determine workout duration from user request
-            duration = 30  # default
-            if "30" in user_request or "thirty" in user_request.lower():
-                duration = 30
-            elif "40" in user_request or "forty" in user_request.lower():
-                duration = 40
-            elif "45" in user_request or "forty-five" in user_request.lower():
-                duration = 45
-            elif "20" in user_request or "twenty" in user_request.lower():
-                duration = 20
-            elif "60" in user_request or "sixty" in user_request.lower():
-                duration = 60
+            duration = _parse_duration(user_request)
 
             # Create structured prompt
             structured_prompt = f"""
@@ -822,13 +1045,11 @@ def generate_workout():
             response_text = (completion.choices[0].message.content or "").strip()
             
             # Try to extract JSON from the response
-            import json
-            import re
             
             # Look for JSON in the response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            json_match = _JSON_OBJ_RE.search(response_text)
             if json_match:
-                workout_json = json.loads(json_match.group())
+                workout_json = _json_loads(json_match.group())
                 
                 # Convert JSON to printable format
                 workout_text = "\n".join(workout_json.get("printable", []))
@@ -838,16 +1059,14 @@ def generate_workout():
                 workout_json["generated_at"] = datetime.now().isoformat()
                 
                 # You could save this structured data to database here
-                print(f"Generated structured workout: {workout_json.get('title', 'Unknown')}")
+                logger.debug("Generated structured workout: %s", workout_json.get('title', 'Unknown'))
                 
             else:
                 # Fallback to plain text if JSON parsing fails
                 workout_text = response_text
         except Exception as openai_error:
-            print(f"OpenAI error: {openai_error}")
+            logger.exception("OpenAI error")
             # Dynamic fallback builder that respects requested total time and avoids symmetric 10-5-10 style patterns
-            import re
-            import random
 
             user_request_lower = user_request.lower()
 
@@ -994,7 +1213,7 @@ def generate_workout():
         try:
             intervals = parse_intervals(workout_text)
         except Exception as parse_err:
-            print(f"Parse error: {parse_err}")
+            logger.exception("Parse error")
 
         # Fallback if parsing failed
         if not intervals:
@@ -1022,9 +1241,7 @@ def generate_workout():
 
     except Exception as e:
         # Ensure JSON error response (avoid HTML)
-        print(f"Error in generate_workout: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in generate_workout")
         return jsonify(success=False, error=f"Generation failed: {str(e)}"), 500
 
 @app.route("/generate_structured_workout", methods=["POST"])
@@ -1051,15 +1268,9 @@ def generate_structured_workout():
         })
 
         try:
-            import random
-            from datetime import datetime
             
-            # Initialize OpenAI client
-            try:
-                client = OpenAI(api_key=api_key)
-            except Exception as client_error:
-                print(f"OpenAI client init error: {client_error}")
-                client = OpenAI(api_key=api_key, base_url="https://api.openai.com/v1")
+            # Reuse the shared OpenAI client (keeps the TLS pool warm)
+            client = _get_openai(api_key)
 
             # Personalized Athlete Profile
             athlete_profile = f"""
@@ -1144,17 +1355,7 @@ def generate_structured_workout():
             """
 
             # Determine workout duration from user request
-            duration = 30  # default
-            if "30" in user_request or "thirty" in user_request.lower():
-                duration = 30
-            elif "40" in user_request or "forty" in user_request.lower():
-                duration = 40
-            elif "45" in user_request or "forty-five" in user_request.lower():
-                duration = 45
-            elif "20" in user_request or "twenty" in user_request.lower():
-                duration = 20
-            elif "60" in user_request or "sixty" in user_request.lower():
-                duration = 60
+            duration = _parse_duration(user_request)
 
             # Create structured prompt
             structured_prompt = f"""
@@ -1188,20 +1389,18 @@ def generate_structured_workout():
             response_text = (completion.choices[0].message.content or "").strip()
             
             # Try to extract JSON from the response
-            import json
-            import re
             
             # Look for JSON in the response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            json_match = _JSON_OBJ_RE.search(response_text)
             if json_match:
-                workout_json = json.loads(json_match.group())
+                workout_json = _json_loads(json_match.group())
                 
                 # Add metadata
                 workout_json["raw_request"] = user_request
                 workout_json["generated_at"] = datetime.now().isoformat()
                 workout_json["whoop_zones"] = whoop_zones
                 
-                print(f"Generated structured workout: {workout_json.get('title', 'Unknown')}")
+                logger.debug("Generated structured workout: %s", workout_json.get('title', 'Unknown'))
                 
                 return jsonify(success=True, workout=workout_json)
                 
@@ -1209,11 +1408,11 @@ def generate_structured_workout():
                 return jsonify(success=False, error="Failed to generate structured workout"), 500
                 
         except Exception as openai_error:
-            print(f"OpenAI error: {openai_error}")
+            logger.exception("OpenAI error")
             return jsonify(success=False, error="Failed to generate workout"), 500
             
     except Exception as e:
-        print(f"Error in generate_structured_workout: {e}")
+        logger.exception("Error in generate_structured_workout")
         return jsonify(success=False, error=str(e)), 500
 
 @app.route("/saved_workouts")
@@ -1241,7 +1440,7 @@ def saved_workouts():
         
         return jsonify(workouts)
     except Exception as e:
-        print(f"Error in saved_workouts: {e}")
+        logger.exception("Error in saved_workouts")
         return jsonify([])
 
 @app.route("/load_workout/<int:workout_id>")
@@ -1263,7 +1462,7 @@ def load_workout(workout_id):
             return jsonify({"success": False, "error": "Workout not found"}), 404
             
     except Exception as e:
-        print(f"Error in load_workout: {e}")
+        logger.exception("Error in load_workout")
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route("/start_session", methods=["POST"])
@@ -1495,7 +1694,7 @@ def generate_whoop_summary():
         if not api_key:
             return jsonify(success=False, error="OpenAI API key not configured"), 500
             
-        client = OpenAI(api_key=api_key)
+        client = _get_openai(api_key)
         
         summary_prompt = f"""
         Generate a concise workout summary for WHOOP integration based on this treadmill session:
@@ -1696,7 +1895,7 @@ def generate_personalized_workout(analysis_data, user_preferences=None):
         if not api_key:
             return {"success": False, "error": "OpenAI API key not configured"}
         
-        client = OpenAI(api_key=api_key)
+        client = _get_openai(api_key)
         
         # Prepare analysis summary for AI
         analysis_summary = f"""
@@ -1892,7 +2091,6 @@ def get_whoop_auth_url():
     if not WHOOP_AVAILABLE:
         return None
     
-    import secrets
     
     # Generate a random 8-character state parameter
     state = secrets.token_urlsafe(6)[:8]  # Generate 8 characters
@@ -1916,13 +2114,12 @@ def exchange_whoop_code_for_token(code):
     try:
         # Check if credentials are configured
         if not WHOOP_CLIENT_ID or not WHOOP_CLIENT_SECRET:
-            print("Error: WHOOP credentials not configured")
+            logger.error("WHOOP credentials not configured")
             return None
-            
-        print(f"Exchanging code for token...")
-        print(f"Client ID present: {bool(WHOOP_CLIENT_ID)}")
-        print(f"Client Secret present: {bool(WHOOP_CLIENT_SECRET)}")
-        print(f"Redirect URI: {WHOOP_REDIRECT_URI}")
+
+        logger.debug("Exchanging code for token (client id present: %s, "
+                     "client secret present: %s, redirect uri: %s)",
+                     bool(WHOOP_CLIENT_ID), bool(WHOOP_CLIENT_SECRET), WHOOP_REDIRECT_URI)
         
         token_url = f"{WHOOP_API_BASE}/oauth/oauth2/token"
         
@@ -1939,26 +2136,23 @@ def exchange_whoop_code_for_token(code):
             'Content-Type': 'application/x-www-form-urlencoded'
         }
         
-        print(f"Request data: {token_data}")
-        print(f"Client secret length: {len(WHOOP_CLIENT_SECRET) if WHOOP_CLIENT_SECRET else 0}")
-        print(f"Full client ID: {WHOOP_CLIENT_ID}")
-        print(f"Full client secret: {WHOOP_CLIENT_SECRET}")
-        print(f"Using client_secret_post method")
-        
+        logger.debug("Using client_secret_post method (client secret length: %s)",
+                     len(WHOOP_CLIENT_SECRET) if WHOOP_CLIENT_SECRET else 0)
+
         response = requests.post(token_url, data=token_data, headers=headers)
-        
-        print(f"Token response status: {response.status_code}")
-        
+
+        logger.debug("Token response status: %s", response.status_code)
+
         if response.status_code != 200:
-            print(f"Token exchange failed: {response.text}")
+            logger.error("Token exchange failed: %s", response.text)
             return None
-            
+
         return response.json()
-        
+
     except requests.exceptions.RequestException as e:
-        print(f"Error exchanging code for token: {e}")
+        logger.exception("Error exchanging code for token")
         if hasattr(e, 'response'):
-            print(f"Response: {e.response.text}")
+            logger.error("Response: %s", e.response.text)
         return None
 
 def get_whoop_user_profile(access_token):
@@ -1972,16 +2166,15 @@ def get_whoop_user_profile(access_token):
         response = requests.get(f"{WHOOP_API_BASE_V1}/user/profile/basic", headers=headers)
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error getting WHOOP profile: {e}")
+    except requests.exceptions.RequestException:
+        logger.exception("Error getting WHOOP profile")
         # Try alternative endpoint
         try:
             response = requests.get(f"{WHOOP_API_BASE_V1}/user", headers=headers)
             response.raise_for_status()
             return response.json()
-        except Exception as e:
-            print(f"Error getting WHOOP user data from alternative endpoint: {e}")
-            pass
+        except Exception:
+            logger.exception("Error getting WHOOP user data from alternative endpoint")
         return None
 
 def get_whoop_recovery_data(access_token, date=None):
@@ -2011,8 +2204,8 @@ def get_whoop_recovery_data(access_token, date=None):
             # If no exact match, return the first record
             return data['records'][0]
         return data
-    except requests.exceptions.RequestException as e:
-        print(f"Error getting WHOOP recovery: {e}")
+    except requests.exceptions.RequestException:
+        logger.exception("Error getting WHOOP recovery")
         return None
 
 def get_whoop_workouts(access_token, start_date=None, end_date=None):
@@ -2029,33 +2222,59 @@ def get_whoop_workouts(access_token, start_date=None, end_date=None):
         response.raise_for_status()
         data = response.json()
         return data.get('records', [])
-    except requests.exceptions.RequestException as e:
-        print(f"Error getting WHOOP workouts: {e}")
+    except requests.exceptions.RequestException:
+        logger.exception("Error getting WHOOP workouts")
         return None
 
 def get_whoop_heart_rate_data(access_token, workout_id):
     """Get heart rate data for a specific workout"""
     try:
         headers = {'Authorization': f'Bearer {access_token}'}
-        response = requests.get(f"{WHOOP_API_BASE_V1}/workout/{workout_id}/heart_rate", headers=headers)
+        response = WHOOP_SESSION.get(f"{WHOOP_API_BASE_V1}/workout/{workout_id}/heart_rate", headers=headers)
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error getting WHOOP heart rate data: {e}")
+    except requests.exceptions.RequestException:
+        logger.exception("Error getting WHOOP heart rate data")
         return None
 
+def get_whoop_heart_rate_data_batch(access_token, workout_ids, max_workers=8):
+    """Get heart rate data for multiple workouts concurrently.
+
+    Fetching N workouts serially costs N round-trips; fanning out over a
+    thread pool (the calls are pure I/O) cuts that to roughly one. Returns
+    {workout_id: data_or_None} so callers can handle partial failures.
+    """
+    if not workout_ids:
+        return {}
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(workout_ids))) as executor:
+        results = executor.map(
+            lambda wid: (wid, get_whoop_heart_rate_data(access_token, wid)),
+            workout_ids
+        )
+        return dict(results)
+
+def dig(d, *keys, default=0):
+    """Walk nested dicts without allocating throwaway empty-dict defaults."""
+    cur = d
+    for k in keys:
+        cur = cur.get(k) if isinstance(cur, dict) else None
+        if cur is None:
+            return default
+    return cur
+
 def analyze_whoop_performance(whoop_data):
     """Analyze WHOOP performance data for workout recommendations"""
     try:
         if not whoop_data:
             return None
-        
+
         analysis = {
-            'recovery_score': whoop_data.get('recovery', {}).get('score', {}).get('recovery_score', 0),
-            'sleep_score': whoop_data.get('sleep', {}).get('score', {}).get('sleep_performance', 0),
-            'strain_score': whoop_data.get('strain', {}).get('score', {}).get('strain', 0),
-            'hrv': whoop_data.get('recovery', {}).get('metrics', {}).get('hrv_rmssd', 0),
-            'resting_heart_rate': whoop_data.get('recovery', {}).get('metrics', {}).get('resting_heart_rate', 0),
+            'recovery_score': dig(whoop_data, 'recovery', 'score', 'recovery_score'),
+            'sleep_score': dig(whoop_data, 'sleep', 'score', 'sleep_performance'),
+            'strain_score': dig(whoop_data, 'strain', 'score', 'strain'),
+            'hrv': dig(whoop_data, 'recovery', 'metrics', 'hrv_rmssd'),
+            'resting_heart_rate': dig(whoop_data, 'recovery', 'metrics', 'resting_heart_rate'),
             'recommendations': []
         }
         
@@ -2072,10 +2291,27 @@ def analyze_whoop_performance(whoop_data):
             analysis['recommendations'].append("High strain - consider reducing workout intensity")
         
         return analysis
-    except Exception as e:
-        print(f"Error analyzing WHOOP data: {e}")
+    except Exception:
+        logger.exception("Error analyzing WHOOP data")
         return None
 
+# Prebuilt error page for the WHOOP OAuth callback; one % substitution per
+# error instead of assembling a multi-line HTML literal on each path.
+_WHOOP_ERR_TMPL = (
+    '<html>'
+    '<body style="font-family: sans-serif; padding: 20px;">'
+    '<h2>%s</h2>'
+    '<p style="color: red;">%s</p>'
+    '%s'
+    '<a href="/">Return to app</a>'
+    '</body>'
+    '</html>'
+)
+
+def _whoop_error_page(message, status, title="WHOOP Connection Failed", extra=""):
+    """Render the WHOOP OAuth error page with the message safely escaped."""
+    return _WHOOP_ERR_TMPL % (escape(title), escape(message), extra), status
+
 # WHOOP API Routes
 @app.route("/whoop/auth")
 def whoop_auth():
@@ -2087,60 +2323,40 @@ def whoop_auth():
 def whoop_callback():
     """Handle WHOOP OAuth callback"""
     try:
-        # Debug: Log all request parameters
-        print(f"WHOOP Callback - All args: {dict(request.args)}")
-        print(f"WHOOP Callback - URL: {request.url}")
-        
+        # Debug: log all request parameters; %s defers str() until a
+        # handler actually wants the message
+        logger.debug("WHOOP Callback - All args: %s", request.args)
+        logger.debug("WHOOP Callback - URL: %s", request.url)
+
         code = request.args.get('code')
         state = request.args.get('state')
         error = request.args.get('error')
         error_description = request.args.get('error_description')
-        
-        print(f"WHOOP Callback - Code: {code[:10] if code else 'None'}...")
-        print(f"WHOOP Callback - State: {state}")
+
+        logger.debug("WHOOP Callback - Code: %s..., State: %s",
+                     code[:10] if code else 'None', state)
         
         if error:
             error_msg = f"WHOOP OAuth Error: {error}"
             if error_description:
                 error_msg += f" - {error_description}"
-            print(f"WHOOP OAuth Error: {error} - {error_description}")
-            return f"""
-            <html>
-            <body style="font-family: sans-serif; padding: 20px;">
-                <h2>WHOOP Connection Failed</h2>
-                <p style="color: red;">{error_msg}</p>
-                <a href="/">Return to app</a>
-            </body>
-            </html>
-            """, 400
-            
+            logger.error("WHOOP OAuth Error: %s - %s", error, error_description)
+            return _whoop_error_page(error_msg, 400)
+
         if not code:
-            print("No authorization code received from WHOOP")
-            return """
-            <html>
-            <body style="font-family: sans-serif; padding: 20px;">
-                <h2>WHOOP Connection Failed</h2>
-                <p style="color: red;">No authorization code received</p>
-                <a href="/">Return to app</a>
-            </body>
-            </html>
-            """, 400
-        
+            logger.error("No authorization code received from WHOOP")
+            return _whoop_error_page("No authorization code received", 400)
+
         # Exchange code for token
-        print(f"About to exchange code: {code[:20]}...")
+        logger.debug("About to exchange code: %s...", code[:20])
         token_data = exchange_whoop_code_for_token(code)
         if not token_data:
-            print("Token exchange returned None - checking logs above")
-            return """
-            <html>
-            <body style="font-family: sans-serif; padding: 20px;">
-                <h2>WHOOP Connection Failed</h2>
-                <p style="color: red;">Failed to exchange code for token. Please check your WHOOP app configuration.</p>
-                <p style="color: gray; font-size: 12px;">Check the server logs for detailed debugging information.</p>
-                <a href="/">Return to app</a>
-            </body>
-            </html>
-            """, 400
+            logger.error("Token exchange returned None - checking logs above")
+            return _whoop_error_page(
+                "Failed to exchange code for token. Please check your WHOOP app configuration.",
+                400,
+                extra='<p style="color: gray; font-size: 12px;">Check the server logs for detailed debugging information.</p>'
+            )
         
         # Store token in session
         session['whoop_access_token'] = token_data.get('access_token')
@@ -2157,16 +2373,11 @@ def whoop_callback():
         return redirect(url_for('index') + '#whoop')
         
     except Exception as e:
-        print(f"Error in whoop_callback: {e}")
-        return f"""
-        <html>
-        <body style="font-family: sans-serif; padding: 20px;">
-            <h2>WHOOP Connection Error</h2>
-            <p style="color: red;">An unexpected error occurred: {str(e)}</p>
-            <a href="/">Return to app</a>
-        </body>
-        </html>
-        """, 500
+        logger.exception("Error in whoop_callback")
+        return _whoop_error_page(
+            f"An unexpected error occurred: {str(e)}", 500,
+            title="WHOOP Connection Error"
+        )
 
 @app.route("/whoop/recovery")
 def get_whoop_recovery():
@@ -2193,9 +2404,10 @@ def get_whoop_recovery():
                     # Get the most recent sleep record
                     latest_sleep = sleep_data['records'][0]
                     recovery_data['sleep_data'] = latest_sleep
-                    print(f"Sleep data found: {latest_sleep.get('score', {}).get('sleep_performance_percentage', 'N/A')}")
-        except Exception as e:
-            print(f"Error fetching sleep data: {e}")
+                    logger.debug("Sleep data found: %s",
+                                 latest_sleep.get('score', {}).get('sleep_performance_percentage', 'N/A'))
+        except Exception:
+            logger.exception("Error fetching sleep data")
         
         try:
             # Get strain data from cycle endpoint - according to WHOOP API docs
@@ -2209,14 +2421,15 @@ def get_whoop_recovery():
                     # Get the most recent cycle record
                     latest_cycle = cycle_data['records'][0]
                     recovery_data['strain_data'] = latest_cycle
-                    print(f"Strain data found: {latest_cycle.get('score', {}).get('strain', 'N/A')}")
-        except Exception as e:
-            print(f"Error fetching strain data: {e}")
+                    logger.debug("Strain data found: %s",
+                                 latest_cycle.get('score', {}).get('strain', 'N/A'))
+        except Exception:
+            logger.exception("Error fetching strain data")
         
         # Analyze the data
         analysis = analyze_whoop_performance(recovery_data)
-        
-        return jsonify({
+
+        return _conditional_json({
             "success": True,
             "recovery_data": recovery_data,
             "analysis": analysis
@@ -2240,7 +2453,7 @@ def get_whoop_workouts_route():
         if not workouts_data:
             return jsonify(success=False, error="Failed to get workouts data"), 400
         
-        return jsonify({
+        return _conditional_json({
             "success": True,
             "workouts": workouts_data
         })
@@ -2282,6 +2495,30 @@ def test_whoop_api():
     
     return jsonify(results)
 
+# Recommendation payloads bucketed by recovery score; shared constants so the
+# route does one threshold scan and one dict merge instead of rebuilding the
+# sub-dict on every request.
+_REC_TABLE = (
+    (30, {
+        "workout_type": "recovery",
+        "intensity": "low",
+        "duration": "20-30 minutes",
+        "description": "Light recovery run or walk"
+    }),
+    (60, {
+        "workout_type": "moderate",
+        "intensity": "medium",
+        "duration": "30-45 minutes",
+        "description": "Moderate endurance or tempo run"
+    }),
+    (101, {
+        "workout_type": "intense",
+        "intensity": "high",
+        "duration": "45-60 minutes",
+        "description": "High-intensity intervals or long run"
+    }),
+)
+
 @app.route("/whoop/recommendations")
 def get_whoop_recommendations():
     """Get workout recommendations based on WHOOP data"""
@@ -2302,33 +2539,12 @@ def get_whoop_recommendations():
         
         # Generate workout recommendation based on recovery
         recovery_score = analysis.get('recovery_score', 50)
-        
-        if recovery_score < 30:
-            workout_type = "recovery"
-            intensity = "low"
-            duration = "20-30 minutes"
-            recommendation = "Light recovery run or walk"
-        elif recovery_score < 60:
-            workout_type = "moderate"
-            intensity = "medium"
-            duration = "30-45 minutes"
-            recommendation = "Moderate endurance or tempo run"
-        else:
-            workout_type = "intense"
-            intensity = "high"
-            duration = "45-60 minutes"
-            recommendation = "High-intensity intervals or long run"
-        
-        return jsonify({
+        rec = next(v for threshold, v in _REC_TABLE if recovery_score < threshold)
+
+        return _conditional_json({
             "success": True,
             "analysis": analysis,
-            "recommendation": {
-                "workout_type": workout_type,
-                "intensity": intensity,
-                "duration": duration,
-                "description": recommendation,
-                "recovery_score": recovery_score
-            }
+            "recommendation": {**rec, "recovery_score": recovery_score}
         })
         
     except Exception as e:
@@ -2476,6 +2692,12 @@ def adapt_current_interval():
     except Exception as e:
         return jsonify(success=False, error=str(e)), 500
 
+# Pace-anchor bases and HR-zone ratios as arrays so one vectorized multiply
+# replaces the per-key scalar math in calculate_fitness_profile
+_PACE_BASE = np.array([3.5, 4.5, 5.5, 6.5, 7.5])
+_PACE_KEYS = ('walk_brisk', 'recovery', 'steady', 'tempo', 'sprint')
+_HR_RATIOS = np.array([0.5, 0.6, 0.7, 0.8, 0.9, 1.0])
+
 # Add new calibration functions after the existing functions
 def calculate_fitness_profile(assessment_data):
     """Calculate personalized fitness profile from assessment data."""
@@ -2529,23 +2751,19 @@ def calculate_fitness_profile(assessment_data):
     
     # Adjust paces based on fitness score
     pace_multiplier = 0.8 + (fitness_score / 100) * 0.4  # 0.8 to 1.2
-    
-    pace_anchors = {
-        'walk_brisk': round(3.5 * pace_multiplier, 1),
-        'recovery': round(4.5 * pace_multiplier, 1),
-        'steady': round(5.5 * pace_multiplier, 1),
-        'tempo': round(6.5 * pace_multiplier, 1),
-        'sprint': round(7.5 * pace_multiplier, 1)
-    }
-    
+
+    # One vectorized multiply for all five anchors
+    pace_anchors = dict(zip(_PACE_KEYS, np.round(_PACE_BASE * pace_multiplier, 1).tolist()))
+
     # Calculate heart rate zones (estimated if no WHOOP data)
     max_hr_estimate = 220 - 30  # Assuming average age, adjust as needed
+    hr = (_HR_RATIOS * max_hr_estimate).tolist()
     hr_zones = {
-        'Z1': [max_hr_estimate * 0.5, max_hr_estimate * 0.6],
-        'Z2': [max_hr_estimate * 0.6, max_hr_estimate * 0.7],
-        'Z3': [max_hr_estimate * 0.7, max_hr_estimate * 0.8],
-        'Z4': [max_hr_estimate * 0.8, max_hr_estimate * 0.9],
-        'Z5': [max_hr_estimate * 0.9, max_hr_estimate]
+        'Z1': [hr[0], hr[1]],
+        'Z2': [hr[1], hr[2]],
+        'Z3': [hr[2], hr[3]],
+        'Z4': [hr[3], hr[4]],
+        'Z5': [hr[4], hr[5]]
     }
     
     # Calculate workout constraints based on fitness level
@@ -2586,55 +2804,149 @@ def calculate_fitness_profile(assessment_data):
         'assessment_data': assessment_data
     }
 
-def generate_personalized_athlete_profile(fitness_profile):
-    """Generate personalized athlete profile for workout generation."""
-    
-    pace_anchors = fitness_profile['pace_anchors']
-    hr_zones = fitness_profile['hr_zones']
-    constraints = fitness_profile['constraints']
-    
+@lru_cache(maxsize=256)
+def _athlete_profile_cached(fitness_level, fitness_score, pace_tuple, hr_tuple, max_duration):
+    """Build the athlete profile string for a hashable fitness-profile key."""
+    walk_brisk, recovery, steady, tempo, sprint = pace_tuple
+    (z2_lo, z2_hi), (z3_lo, z3_hi), (z4_lo, z4_hi) = hr_tuple
+
     profile = f"""
     ATHLETE PROFILE:
     - Device: Treadmill, speed in mph, show segment lengths
-    - Fitness Level: {fitness_profile['fitness_level'].title()} (Score: {fitness_profile['fitness_score']}/100)
+    - Fitness Level: {fitness_level.title()} (Score: {fitness_score}/100)
     - Pace anchors (0-1% incline):
-      * {pace_anchors['walk_brisk']} mph = brisk walk
-      * {pace_anchors['recovery']} mph = very easy jog (recovery)
-      * {pace_anchors['steady']} mph = easy-moderate (steady)
-      * {pace_anchors['tempo']} mph = challenging but doable
-      * {pace_anchors['sprint']} mph = comfortable sprint
-    - HR zones: Z2 {int(hr_zones['Z2'][0])}-{int(hr_zones['Z2'][1])}, Z3 {int(hr_zones['Z3'][0])}-{int(hr_zones['Z3'][1])}, Z4 {int(hr_zones['Z4'][0])}-{int(hr_zones['Z4'][1])}
+      * {walk_brisk} mph = brisk walk
+      * {recovery} mph = very easy jog (recovery)
+      * {steady} mph = easy-moderate (steady)
+      * {tempo} mph = challenging but doable
+      * {sprint} mph = comfortable sprint
+    - HR zones: Z2 {z2_lo}-{z2_hi}, Z3 {z3_lo}-{z3_hi}, Z4 {z4_lo}-{z4_hi}
     - Preferences: variety but structured; keep mostly Z3 with controlled Z4 surges; use mild inclines
-    - Duration defaults: {constraints['max_duration']} min max
+    - Duration defaults: {max_duration} min max
+    """
+
+    # Leading indentation is pure token overhead on the wire
+    return dedent(profile).strip()
+
+def generate_personalized_athlete_profile(fitness_profile):
+    """Generate personalized athlete profile for workout generation.
+
+    The profile text only depends on a handful of scalars derived from the
+    fitness score, so repeat generations for the same user hit the cache.
     """
-    
-    return profile
 
-def generate_personalized_constraints(fitness_profile):
-    """Generate personalized constraints for workout generation."""
-    
     pace_anchors = fitness_profile['pace_anchors']
+    hr_zones = fitness_profile['hr_zones']
     constraints = fitness_profile['constraints']
-    
+
+    return _athlete_profile_cached(
+        fitness_profile['fitness_level'],
+        fitness_profile['fitness_score'],
+        (pace_anchors['walk_brisk'], pace_anchors['recovery'], pace_anchors['steady'],
+         pace_anchors['tempo'], pace_anchors['sprint']),
+        tuple((int(hr_zones[z][0]), int(hr_zones[z][1])) for z in ('Z2', 'Z3', 'Z4')),
+        constraints['max_duration']
+    )
+
+@lru_cache(maxsize=256)
+def _constraints_cached(pace_tuple, constraints_tuple):
+    """Build the constraints string for a hashable fitness-profile key."""
+    recovery, steady, tempo, sprint = pace_tuple
+    z3_target, z4_target, max_speed, max_incline, recovery_ratio = constraints_tuple
+
     # Calculate speed bounds based on pace anchors
-    steady_min = pace_anchors['steady'] - 0.5
-    steady_max = pace_anchors['steady'] + 0.5
-    surge_min = pace_anchors['tempo'] - 0.3
-    surge_max = pace_anchors['tempo'] + 0.7
-    recovery_min = pace_anchors['recovery'] - 0.5
-    recovery_max = pace_anchors['recovery'] + 0.3
-    
+    steady_min = steady - 0.5
+    steady_max = steady + 0.5
+    surge_min = tempo - 0.3
+    surge_max = tempo + 0.7
+    recovery_min = recovery - 0.5
+    recovery_max = recovery + 0.3
+
     constraints_text = f"""
     CONSTRAINTS & DIFFICULTY KNOBS:
-    - Target intensity mix: {constraints['z3_target']}-75% Z3, {constraints['z4_target']}-20% Z4, remainder Z1-Z2
-    - Speed bounds: steady {steady_min:.1f}-{steady_max:.1f} mph; surges {surge_min:.1f}-{surge_max:.1f} mph; cap max at {constraints['max_speed']} mph; recoveries {recovery_min:.1f}-{recovery_max:.1f} mph
-    - Incline rules: recoveries 0-1%; steadies 0-1%; surges up to {constraints['max_incline']}%; no hills on sprints if using {pace_anchors['sprint']}+ mph
-    - Work:recovery ratios: 1:{constraints['recovery_ratio']} for surges ≤60s, 2:1 for steadies; minimum interval length 1:00
+    - Target intensity mix: {z3_target}-75% Z3, {z4_target}-20% Z4, remainder Z1-Z2
+    - Speed bounds: steady {steady_min:.1f}-{steady_max:.1f} mph; surges {surge_min:.1f}-{surge_max:.1f} mph; cap max at {max_speed} mph; recoveries {recovery_min:.1f}-{recovery_max:.1f} mph
+    - Incline rules: recoveries 0-1%; steadies 0-1%; surges up to {max_incline}%; no hills on sprints if using {sprint}+ mph
+    - Work:recovery ratios: 1:{recovery_ratio} for surges ≤60s, 2:1 for steadies; minimum interval length 1:00
     - Progression: if prior run felt ≤7/10 RPE or Z3 time <60%, add +0.1-0.2 mph to steady sections next time; otherwise keep speeds and add +1 min total time
     - Output language: mph only; print by segment length
     """
-    
-    return constraints_text
+
+    return dedent(constraints_text).strip()
+
+def generate_personalized_constraints(fitness_profile):
+    """Generate personalized constraints for workout generation.
+
+    Cached by the same coarse fitness-profile key as the athlete profile.
+    """
+
+    pace_anchors = fitness_profile['pace_anchors']
+    constraints = fitness_profile['constraints']
+
+    return _constraints_cached(
+        (pace_anchors['recovery'], pace_anchors['steady'], pace_anchors['tempo'],
+         pace_anchors['sprint']),
+        (constraints['z3_target'], constraints['z4_target'], constraints['max_speed'],
+         constraints['max_incline'], constraints['recovery_ratio'])
+    )
+
+# Schema prompt for /generate_personalized_workout, parsed once at import.
+# A single .format() call fills in the ~15 profile-derived numbers per request
+# instead of re-building the whole literal through an f-string.
+_PERSONALIZED_SCHEMA_TMPL = dedent("""
+            STRICT OUTPUT SCHEMA - Return ONLY valid JSON that matches this format:
+            {{
+              "title": "Workout title with duration and focus",
+              "total_time_min": <total_duration>,
+              "rules": {{
+                "speeds": {{
+                  "walk_brisk": {walk_brisk},
+                  "recovery": [{recovery_lo}, {recovery_hi}],
+                  "steady": [{steady_lo}, {steady_hi}],
+                  "surge": [{surge_lo}, {surge_hi}],
+                  "max_sprint": [{sprint}, {max_speed}]
+                }},
+                "incline_pct": {{
+                  "recovery": [0, 1],
+                  "steady": [0, 1],
+                  "surge": [0, {max_incline}],
+                  "max_sprint": [0, 2]
+                }},
+                "zones": {{
+                  "Z2": [{z2_lo}, {z2_hi}],
+                  "Z3": [{z3_lo}, {z3_hi}],
+                  "Z4": [{z4_lo}, {z4_hi}],
+                  "Z5": [{z5_lo}, {z5_hi}]
+                }},
+                "time_in_zones_target_pct": {{
+                  "Z3": {z3_target},
+                  "Z4": {z4_target},
+                  "other": {z_other}
+                }},
+                "segment_min_sec": 60,
+                "max_segments_above_7mph": 3,
+                "max_duration_above_7mph_sec": 60,
+                "min_recovery_after_7mph_sec": 90
+              }},
+              "segments": [
+                {{
+                  "order": <segment_number>,
+                  "duration_sec": <duration_in_seconds>,
+                  "speed_mph": <speed>,
+                  "incline_pct": <incline>,
+                  "intent": "<warmup|steady|surge|recovery|max_sprint|cooldown>",
+                  "target_hr_zone": "<Z2|Z3|Z4|Z5>"
+                }}
+              ],
+              "summary": {{
+                "target_mix": {{"Z3_pct": <percentage>, "Z4_pct": <percentage>}},
+                "avg_speed_mph": <average_speed>
+              }},
+              "printable": [
+                "<duration> min @ <speed> mph — <description>"
+              ]
+            }}
+            """).strip()
 
 # Add new calibration endpoints
 @app.route("/calibrate", methods=["POST"])
@@ -2663,7 +2975,7 @@ def calibrate_user():
         return jsonify(success=True, calibration=calibration_data)
         
     except Exception as e:
-        print(f"Error in calibrate_user: {e}")
+        logger.exception("Error in calibrate_user")
         return jsonify(success=False, error=str(e)), 500
 
 @app.route("/generate_personalized_workout", methods=["POST"])
@@ -2687,15 +2999,6 @@ def generate_personalized_workout():
             return jsonify(success=False, error="Please provide calibration data"), 400
 
         try:
-            import random
-            from datetime import datetime
-            
-            # Initialize OpenAI client
-            try:
-                client = OpenAI(api_key=api_key)
-            except Exception as client_error:
-                print(f"OpenAI client init error: {client_error}")
-                client = OpenAI(api_key=api_key, base_url="https://api.openai.com/v1")
 
             # Get fitness profile
             fitness_profile = calibration_data.get('fitness_profile', {})
@@ -2721,101 +3024,71 @@ def generate_personalized_workout():
             pace_anchors = fitness_profile.get('pace_anchors', {})
             constraints_data = fitness_profile.get('constraints', {})
             
-            json_schema = f"""
-            STRICT OUTPUT SCHEMA - Return ONLY valid JSON that matches this format:
-            {{
-              "title": "Workout title with duration and focus",
-              "total_time_min": <total_duration>,
-              "rules": {{
-                "speeds": {{
-                  "walk_brisk": {pace_anchors.get('walk_brisk', 3.9)},
-                  "recovery": [{pace_anchors.get('recovery', 4.5) - 0.5}, {pace_anchors.get('recovery', 4.5) + 0.3}],
-                  "steady": [{pace_anchors.get('steady', 5.8) - 0.5}, {pace_anchors.get('steady', 5.8) + 0.5}],
-                  "surge": [{pace_anchors.get('tempo', 6.7) - 0.3}, {pace_anchors.get('tempo', 6.7) + 0.7}],
-                  "max_sprint": [{pace_anchors.get('sprint', 7.3)}, {constraints_data.get('max_speed', 8.0)}]
-                }},
-                "incline_pct": {{
-                  "recovery": [0, 1],
-                  "steady": [0, 1],
-                  "surge": [0, {constraints_data.get('max_incline', 4)}],
-                  "max_sprint": [0, 2]
-                }},
-                "zones": {{
-                  "Z2": [{whoop_zones['Z2'][0]}, {whoop_zones['Z2'][1]}],
-                  "Z3": [{whoop_zones['Z3'][0]}, {whoop_zones['Z3'][1]}],
-                  "Z4": [{whoop_zones['Z4'][0]}, {whoop_zones['Z4'][1]}],
-                  "Z5": [{whoop_zones['Z5'][0]}, {whoop_zones['Z5'][1]}]
-                }},
-                "time_in_zones_target_pct": {{
-                  "Z3": {constraints_data.get('z3_target', 60)},
-                  "Z4": {constraints_data.get('z4_target', 15)},
-                  "other": {100 - constraints_data.get('z3_target', 60) - constraints_data.get('z4_target', 15)}
-                }},
-                "segment_min_sec": 60,
-                "max_segments_above_7mph": 3,
-                "max_duration_above_7mph_sec": 60,
-                "min_recovery_after_7mph_sec": 90
-              }},
-              "segments": [
-                {{
-                  "order": <segment_number>,
-                  "duration_sec": <duration_in_seconds>,
-                  "speed_mph": <speed>,
-                  "incline_pct": <incline>,
-                  "intent": "<warmup|steady|surge|recovery|max_sprint|cooldown>",
-                  "target_hr_zone": "<Z2|Z3|Z4|Z5>"
-                }}
-              ],
-              "summary": {{
-                "target_mix": {{"Z3_pct": <percentage>, "Z4_pct": <percentage>}},
-                "avg_speed_mph": <average_speed>
-              }},
-              "printable": [
-                "<duration> min @ <speed> mph — <description>"
-              ]
-            }}
-            """
+            z3_target = constraints_data.get('z3_target', 60)
+            z4_target = constraints_data.get('z4_target', 15)
+            json_schema = _PERSONALIZED_SCHEMA_TMPL.format(
+                walk_brisk=pace_anchors.get('walk_brisk', 3.9),
+                recovery_lo=pace_anchors.get('recovery', 4.5) - 0.5,
+                recovery_hi=pace_anchors.get('recovery', 4.5) + 0.3,
+                steady_lo=pace_anchors.get('steady', 5.8) - 0.5,
+                steady_hi=pace_anchors.get('steady', 5.8) + 0.5,
+                surge_lo=pace_anchors.get('tempo', 6.7) - 0.3,
+                surge_hi=pace_anchors.get('tempo', 6.7) + 0.7,
+                sprint=pace_anchors.get('sprint', 7.3),
+                max_speed=constraints_data.get('max_speed', 8.0),
+                max_incline=constraints_data.get('max_incline', 4),
+                z2_lo=whoop_zones['Z2'][0], z2_hi=whoop_zones['Z2'][1],
+                z3_lo=whoop_zones['Z3'][0], z3_hi=whoop_zones['Z3'][1],
+                z4_lo=whoop_zones['Z4'][0], z4_hi=whoop_zones['Z4'][1],
+                z5_lo=whoop_zones['Z5'][0], z5_hi=whoop_zones['Z5'][1],
+                z3_target=z3_target,
+                z4_target=z4_target,
+                z_other=100 - z3_target - z4_target,
+            )
 
             # Determine workout duration from user request
             max_duration = constraints_data.get('max_duration', 30)
-            duration = min(max_duration, 30)  # default
-            
-            if "30" in user_request or "thirty" in user_request.lower():
-                duration = min(30, max_duration)
-            elif "40" in user_request or "forty" in user_request.lower():
-                duration = min(40, max_duration)
-            elif "45" in user_request or "forty-five" in user_request.lower():
-                duration = min(45, max_duration)
-            elif "20" in user_request or "twenty" in user_request.lower():
-                duration = min(20, max_duration)
-            elif "60" in user_request or "sixty" in user_request.lower():
-                duration = min(60, max_duration)
-
-            # Create structured prompt
-            structured_prompt = f"""
-            {athlete_profile}
-            
-            {constraints}
-            
-            {json_schema}
-            
-            USER REQUEST: {user_request}
-            TARGET DURATION: {duration} minutes
-            FITNESS LEVEL: {fitness_profile.get('fitness_level', 'intermediate')}
-            
-            Generate a structured treadmill workout that matches the user's request and follows all constraints. 
-            Return ONLY the JSON object, no additional text or explanations.
-            """
+            duration = min(_parse_duration(user_request), max_duration)
 
-            completion = client.chat.completions.create(
+            # Static profile scaffold rides in the system message (eligible
+            # for OpenAI's prompt cache on repeat users); only the dynamic
+            # ask stays in the user message.
+            messages = [
+                {
+                    "role": "system",
+                    "content": (
+                        "You are an expert running coach who creates structured, personalized treadmill workouts. "
+                        "You always return valid JSON that matches the exact schema provided.\n\n"
+                        f"{athlete_profile}\n\n{constraints}\n\n{json_schema}"
+                    ),
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        f"USER REQUEST: {user_request}\n"
+                        f"TARGET DURATION: {duration} minutes\n"
+                        f"FITNESS LEVEL: {fitness_profile.get('fitness_level', 'intermediate')}\n\n"
+                        "Generate a structured treadmill workout that matches the user's request and follows all constraints."
+                    ),
+                },
+            ]
+
+            # Opt-in streaming: callers that set "stream" get NDJSON deltas
+            # instead of waiting out the full completion
+            if body.get("stream"):
+                def _finalize(workout_json):
+                    workout_json["raw_request"] = user_request
+                    workout_json["generated_at"] = datetime.now().isoformat()
+                    workout_json["fitness_profile"] = fitness_profile
+                    workout_json["whoop_zones"] = whoop_zones
+                    return workout_json
+                return _stream_generation(api_key, messages, _finalize)
+
+            completion = _chat_completion(
+                api_key,
                 model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert running coach who creates structured, personalized treadmill workouts. You always return valid JSON that matches the exact schema provided."
-                    },
-                    {"role": "user", "content": structured_prompt},
-                ],
+                response_format={"type": "json_object"},
+                messages=messages,
                 temperature=0.7,
                 max_tokens=1500,
             )
@@ -2824,21 +3097,22 @@ def generate_personalized_workout():
             response_text = (completion.choices[0].message.content or "").strip()
             
             # Try to extract JSON from the response
-            import json
-            import re
             
-            # Look for JSON in the response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                workout_json = json.loads(json_match.group())
-                
+            # JSON mode guarantees an object; keep the scanner as fallback
+            try:
+                workout_json = _json_loads(response_text)
+            except ValueError:
+                json_str = _extract_json_object(response_text)
+                workout_json = _json_loads(json_str) if json_str else None
+
+            if workout_json:
                 # Add metadata
                 workout_json["raw_request"] = user_request
                 workout_json["generated_at"] = datetime.now().isoformat()
                 workout_json["fitness_profile"] = fitness_profile
                 workout_json["whoop_zones"] = whoop_zones
                 
-                print(f"Generated personalized workout: {workout_json.get('title', 'Unknown')} for {fitness_profile.get('fitness_level', 'unknown')} level")
+                logger.debug("Generated personalized workout: %s for %s level", workout_json.get('title', 'Unknown'), fitness_profile.get('fitness_level', 'unknown'))
                 
                 return jsonify(success=True, workout=workout_json)
                 
@@ -2846,11 +3120,11 @@ def generate_personalized_workout():
                 return jsonify(success=False, error="Failed to generate structured workout"), 500
                 
         except Exception as openai_error:
-            print(f"OpenAI error: {openai_error}")
+            logger.exception("OpenAI error")
             return jsonify(success=False, error="Failed to generate workout"), 500
             
     except Exception as e:
-        print(f"Error in generate_personalized_workout: {e}")
+        logger.exception("Error in generate_personalized_workout")
         return jsonify(success=False, error=str(e)), 500
 
 # Add after the existing calibration functions
@@ -2879,8 +3153,8 @@ def create_athlete_profile_from_data(profile_data):
     - Goals: {goals.get('description', 'general fitness')}
     - Preferences: variety but structured; keep mostly Z3 with controlled Z4 surges; use mild inclines
     """
-    
-    return athlete_profile
+
+    return dedent(athlete_profile).strip()
 
 def create_constraints_from_data(constraints_data):
     """Create constraints from specific user data."""
@@ -2894,8 +3168,183 @@ def create_constraints_from_data(constraints_data):
     - Cooldown: {constraints_data.get('cooldown_duration', 3)}:00 at {constraints_data.get('cooldown_speed', 4.0)} mph
     - Output language: mph only; print by segment length
     """
-    
-    return constraints_text
+
+    return dedent(constraints_text).strip()
+
+# Compiled once at import; substitute() makes a single pass over the template
+# instead of re-running ~20 f-string interpolations per request.
+_PROFILE_SCHEMA_TMPL = string.Template(dedent("""
+            STRICT OUTPUT SCHEMA - Return ONLY valid JSON that matches this format:
+            {
+              "title": "Workout title with duration and focus",
+              "total_time_min": <total_duration>,
+              "rules": {
+                "speeds": {
+                  "walk_brisk": $walk,
+                  "recovery": [$recovery_min, $recovery_max],
+                  "steady": [$steady_min, $steady_max],
+                  "surge": [$surge_min, $surge_max],
+                  "max_sprint": [$comfortable_sprint, $max_speed]
+                },
+                "incline_pct": {
+                  "recovery": [0, $recovery_incline_max],
+                  "steady": [0, $steady_incline_max],
+                  "surge": [0, $surge_incline_max],
+                  "max_sprint": [0, 2]
+                },
+                "zones": {
+                  "Z2": [$z2_lo, $z2_hi],
+                  "Z3": [$z3_lo, $z3_hi],
+                  "Z4": [$z4_lo, $z4_hi],
+                  "Z5": [$z5_lo, $z5_hi]
+                },
+                "time_in_zones_target_pct": {
+                  "Z3": $z3_target,
+                  "Z4": $z4_target,
+                  "other": $z_other
+                },
+                "segment_min_sec": $min_interval_seconds,
+                "max_segments_above_7mph": 3,
+                "max_duration_above_7mph_sec": $max_surge_duration,
+                "min_recovery_after_7mph_sec": 90
+              },
+              "segments": [
+                {
+                  "order": <segment_number>,
+                  "duration_sec": <duration_in_seconds>,
+                  "speed_mph": <speed>,
+                  "incline_pct": <incline>,
+                  "intent": "<warmup|steady|surge|recovery|max_sprint|cooldown>",
+                  "target_hr_zone": "<Z2|Z3|Z4|Z5>"
+                }
+              ],
+              "summary": {
+                "target_mix": {"Z3_pct": <percentage>, "Z4_pct": <percentage>},
+                "avg_speed_mph": <average_speed>
+              },
+              "printable": [
+                "<duration> min @ <speed> mph — <description>"
+              ]
+            }
+            """).strip())
+
+def _profile_json_schema(profile_data):
+    """Build the strict output schema for a profile payload."""
+    hr_zones = profile_data.get('hr_zones', {
+        'Z2': [140, 152],
+        'Z3': [153, 164],
+        'Z4': [165, 177],
+        'Z5': [178, 999]
+    })
+    pace_anchors = profile_data.get('pace_anchors', {})
+    constraints_data = profile_data.get('constraints', {})
+    z3_target = constraints_data.get('z3_target', 65)
+    z4_target = constraints_data.get('z4_target', 15)
+
+    vals = {
+        'walk': pace_anchors.get('walk', 3.9),
+        'comfortable_sprint': pace_anchors.get('comfortable_sprint', 7.0),
+        'recovery_min': constraints_data.get('recovery_min', 4.5),
+        'recovery_max': constraints_data.get('recovery_max', 5.3),
+        'steady_min': constraints_data.get('steady_min', 5.8),
+        'steady_max': constraints_data.get('steady_max', 6.3),
+        'surge_min': constraints_data.get('surge_min', 6.7),
+        'surge_max': constraints_data.get('surge_max', 7.2),
+        'max_speed': constraints_data.get('max_speed', 8.0),
+        'recovery_incline_max': constraints_data.get('recovery_incline_max', 1),
+        'steady_incline_max': constraints_data.get('steady_incline_max', 1),
+        'surge_incline_max': constraints_data.get('surge_incline_max', 4),
+        'z2_lo': hr_zones['Z2'][0], 'z2_hi': hr_zones['Z2'][1],
+        'z3_lo': hr_zones['Z3'][0], 'z3_hi': hr_zones['Z3'][1],
+        'z4_lo': hr_zones['Z4'][0], 'z4_hi': hr_zones['Z4'][1],
+        'z5_lo': hr_zones['Z5'][0], 'z5_hi': hr_zones['Z5'][1],
+        'z3_target': z3_target,
+        'z4_target': z4_target,
+        'z_other': 100 - z3_target - z4_target,
+        'min_interval_seconds': constraints_data.get('min_interval_seconds', 60),
+        'max_surge_duration': constraints_data.get('max_surge_duration', 60),
+    }
+    return _PROFILE_SCHEMA_TMPL.substitute(vals)
+
+@lru_cache(maxsize=256)
+def _profile_prompt(profile_blob):
+    """Build (athlete_profile, constraints, json_schema) for a profile blob.
+
+    Keyed on the sort_keys-serialized profile JSON, so a user re-posting the
+    same profile skips all three string assemblies.
+    """
+    profile_data = json.loads(profile_blob)
+    return (
+        create_athlete_profile_from_data(profile_data),
+        create_constraints_from_data(profile_data.get('constraints', {})),
+        _profile_json_schema(profile_data),
+    )
+
+# Semantic cache: near-identical asks ("30 min Z3 with surges" vs
+# "thirty-minute Z3 with a few surges") reuse a cached workout when their
+# request embeddings are close enough. Entries are bucketed by
+# (profile_hash, duration) so hits never cross profiles.
+_SEM_CACHE = {}
+_SEM_CACHE_MAX = 32          # embeddings kept per (profile, duration) bucket
+_SEM_CACHE_MAX_BUCKETS = 64  # buckets kept overall; oldest evicted first
+_SEM_THRESHOLD = 0.93
+
+def _embed_request(api_key, text):
+    """Embed the request text; returns a unit-norm vector, or None on error."""
+    try:
+        resp = _get_openai(api_key).embeddings.create(
+            model="text-embedding-3-small", input=text)
+        vec = np.asarray(resp.data[0].embedding)
+        return vec / np.linalg.norm(vec)
+    except Exception:
+        logger.exception("Embedding request failed; skipping semantic cache")
+        return None
+
+def _semantic_cache_get(bucket_key, vec):
+    bucket = _SEM_CACHE.get(bucket_key)
+    if not bucket or vec is None:
+        return None
+    sims = np.stack([entry[0] for entry in bucket]) @ vec
+    best = int(np.argmax(sims))
+    if sims[best] > _SEM_THRESHOLD:
+        return bucket[best][1]
+    return None
+
+def _semantic_cache_put(bucket_key, vec, workout):
+    if vec is None:
+        return
+    bucket = _SEM_CACHE.get(bucket_key)
+    if bucket is None:
+        # Bound the bucket count too: each entry holds an embedding plus a
+        # full workout, and per-user profile hashes would otherwise grow
+        # the cache without limit. Same eviction style as _GEN_CACHE.
+        if len(_SEM_CACHE) >= _SEM_CACHE_MAX_BUCKETS:
+            _SEM_CACHE.pop(next(iter(_SEM_CACHE)))
+        bucket = _SEM_CACHE[bucket_key] = []
+    bucket.append((vec, workout))
+    if len(bucket) > _SEM_CACHE_MAX:
+        del bucket[0]
+
+# Exact-match generation cache: a repeat (profile, request, duration) ask
+# within the TTL returns the previous workout without touching OpenAI.
+_GEN_CACHE = {}
+_GEN_CACHE_TTL = 300  # seconds
+_GEN_CACHE_MAX = 128
+
+def _gen_cache_get(key):
+    hit = _GEN_CACHE.get(key)
+    if hit is None:
+        return None
+    ts, workout = hit
+    if time.time() - ts > _GEN_CACHE_TTL:
+        del _GEN_CACHE[key]
+        return None
+    return workout
+
+def _gen_cache_put(key, workout):
+    if len(_GEN_CACHE) >= _GEN_CACHE_MAX:
+        _GEN_CACHE.pop(next(iter(_GEN_CACHE)))
+    _GEN_CACHE[key] = (time.time(), workout)
 
 @app.route("/generate_from_profile", methods=["POST"])
 def generate_from_profile():
@@ -2918,136 +3367,73 @@ def generate_from_profile():
             return jsonify(success=False, error="Please provide athlete profile data"), 400
 
         try:
-            from datetime import datetime
-            
-            # Initialize OpenAI client
-            try:
-                client = OpenAI(api_key=api_key)
-            except Exception as client_error:
-                print(f"OpenAI client init error: {client_error}")
-                client = OpenAI(api_key=api_key, base_url="https://api.openai.com/v1")
 
-            # Create personalized athlete profile
-            athlete_profile = create_athlete_profile_from_data(profile_data)
-            
-            # Create personalized constraints
-            constraints = create_constraints_from_data(profile_data.get('constraints', {}))
-            
-            # Get heart rate zones
-            hr_zones = profile_data.get('hr_zones', {
-                'Z2': [140, 152],
-                'Z3': [153, 164],
-                'Z4': [165, 177],
-                'Z5': [178, 999]
-            })
-            
-            # Get pace anchors
-            pace_anchors = profile_data.get('pace_anchors', {
-                'walk': 3.9,
-                'very_easy': 5.5,
-                'easy_moderate': 6.1,
-                'challenging': 6.5,
-                'comfortable_sprint': 7.0
-            })
-            
-            # Get constraints data
-            constraints_data = profile_data.get('constraints', {})
-            
-            # Strict JSON Schema with personalized data
-            json_schema = f"""
-            STRICT OUTPUT SCHEMA - Return ONLY valid JSON that matches this format:
-            {{
-              "title": "Workout title with duration and focus",
-              "total_time_min": <total_duration>,
-              "rules": {{
-                "speeds": {{
-                  "walk_brisk": {pace_anchors.get('walk', 3.9)},
-                  "recovery": [{constraints_data.get('recovery_min', 4.5)}, {constraints_data.get('recovery_max', 5.3)}],
-                  "steady": [{constraints_data.get('steady_min', 5.8)}, {constraints_data.get('steady_max', 6.3)}],
-                  "surge": [{constraints_data.get('surge_min', 6.7)}, {constraints_data.get('surge_max', 7.2)}],
-                  "max_sprint": [{pace_anchors.get('comfortable_sprint', 7.0)}, {constraints_data.get('max_speed', 8.0)}]
-                }},
-                "incline_pct": {{
-                  "recovery": [0, {constraints_data.get('recovery_incline_max', 1)}],
-                  "steady": [0, {constraints_data.get('steady_incline_max', 1)}],
-                  "surge": [0, {constraints_data.get('surge_incline_max', 4)}],
-                  "max_sprint": [0, 2]
-                }},
-                "zones": {{
-                  "Z2": [{hr_zones['Z2'][0]}, {hr_zones['Z2'][1]}],
-                  "Z3": [{hr_zones['Z3'][0]}, {hr_zones['Z3'][1]}],
-                  "Z4": [{hr_zones['Z4'][0]}, {hr_zones['Z4'][1]}],
-                  "Z5": [{hr_zones['Z5'][0]}, {hr_zones['Z5'][1]}]
-                }},
-                "time_in_zones_target_pct": {{
-                  "Z3": {constraints_data.get('z3_target', 65)},
-                  "Z4": {constraints_data.get('z4_target', 15)},
-                  "other": {100 - constraints_data.get('z3_target', 65) - constraints_data.get('z4_target', 15)}
-                }},
-                "segment_min_sec": {constraints_data.get('min_interval_seconds', 60)},
-                "max_segments_above_7mph": 3,
-                "max_duration_above_7mph_sec": {constraints_data.get('max_surge_duration', 60)},
-                "min_recovery_after_7mph_sec": 90
-              }},
-              "segments": [
-                {{
-                  "order": <segment_number>,
-                  "duration_sec": <duration_in_seconds>,
-                  "speed_mph": <speed>,
-                  "incline_pct": <incline>,
-                  "intent": "<warmup|steady|surge|recovery|max_sprint|cooldown>",
-                  "target_hr_zone": "<Z2|Z3|Z4|Z5>"
-                }}
-              ],
-              "summary": {{
-                "target_mix": {{"Z3_pct": <percentage>, "Z4_pct": <percentage>}},
-                "avg_speed_mph": <average_speed>
-              }},
-              "printable": [
-                "<duration> min @ <speed> mph — <description>"
-              ]
-            }}
-            """
+            # Prompt scaffold is pure in the profile payload; memoized per blob
+            profile_blob = json.dumps(profile_data, sort_keys=True)
+            athlete_profile, constraints, json_schema = _profile_prompt(profile_blob)
 
             # Determine workout duration from user request
-            duration = 30  # default
-            if "30" in user_request or "thirty" in user_request.lower():
-                duration = 30
-            elif "40" in user_request or "forty" in user_request.lower():
-                duration = 40
-            elif "45" in user_request or "forty-five" in user_request.lower():
-                duration = 45
-            elif "20" in user_request or "twenty" in user_request.lower():
-                duration = 20
-            elif "60" in user_request or "sixty" in user_request.lower():
-                duration = 60
-
-            # Create structured prompt
-            structured_prompt = f"""
-            You are a treadmill run planner. Use the athlete profile below and obey constraints and schema. If any constraint conflicts, adjust speed first, then incline. Return valid JSON only.
+            duration = _parse_duration(user_request)
 
-            {athlete_profile}
-            
-            {constraints}
-            
-            {json_schema}
-            
-            USER REQUEST: {user_request}
-            TARGET DURATION: {duration} minutes
-            
-            Generate a structured treadmill workout that matches the user's request and follows all constraints. 
-            Return ONLY the JSON object, no additional text or explanations.
-            """
-
-            completion = client.chat.completions.create(
+            # Identical asks within the TTL short-circuit before OpenAI
+            cache_key = (
+                hashlib.blake2b(profile_blob.encode(), digest_size=16).hexdigest(),
+                user_request,
+                duration,
+            )
+            cached = _gen_cache_get(cache_key)
+            if cached is not None:
+                return jsonify(success=True, workout=cached)
+
+            # Semantically similar asks also short-circuit: one ~50ms
+            # embedding call replaces the whole generation round-trip
+            sem_key = (cache_key[0], duration)
+            req_vec = _embed_request(api_key, user_request)
+            similar = _semantic_cache_get(sem_key, req_vec)
+            if similar is not None:
+                workout = dict(similar)
+                workout["generated_at"] = datetime.now().isoformat()
+                return jsonify(success=True, workout=workout)
+
+            # Static profile scaffold rides in the system message (eligible
+            # for OpenAI's prompt cache on repeat users); only the dynamic
+            # ask stays in the user message.
+            messages = [
+                {
+                    "role": "system",
+                    "content": (
+                        "You are a treadmill run planner. Use the athlete profile below and obey constraints and schema. "
+                        "If any constraint conflicts, adjust speed first, then incline. Return valid JSON only.\n\n"
+                        f"{athlete_profile}\n\n{constraints}\n\n{json_schema}"
+                    ),
+                },
+                {
+                    "role": "user",
+                    "content": (
+                        f"USER REQUEST: {user_request}\n"
+                        f"TARGET DURATION: {duration} minutes\n\n"
+                        "Generate a structured treadmill workout that matches the user's request and follows all constraints."
+                    ),
+                },
+            ]
+
+            # Opt-in streaming: callers that set "stream" get NDJSON deltas
+            # instead of waiting out the full completion
+            if body.get("stream"):
+                def _finalize(workout_json):
+                    workout_json["raw_request"] = user_request
+                    workout_json["generated_at"] = datetime.now().isoformat()
+                    workout_json["athlete_profile"] = profile_data
+                    _gen_cache_put(cache_key, workout_json)
+                    _semantic_cache_put(sem_key, req_vec, workout_json)
+                    return workout_json
+                return _stream_generation(api_key, messages, _finalize)
+
+            completion = _chat_completion(
+                api_key,
                 model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a treadmill run planner. Use the athlete profile below and obey constraints and schema. If any constraint conflicts, adjust speed first, then incline. Return valid JSON only."
-                    },
-                    {"role": "user", "content": structured_prompt},
-                ],
+                response_format={"type": "json_object"},
+                messages=messages,
                 temperature=0.7,
                 max_tokens=1500,
             )
@@ -3056,32 +3442,164 @@ def generate_from_profile():
             response_text = (completion.choices[0].message.content or "").strip()
             
             # Try to extract JSON from the response
-            import json
-            import re
             
-            # Look for JSON in the response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                workout_json = json.loads(json_match.group())
-                
+            # JSON mode guarantees an object; keep the scanner as fallback
+            try:
+                workout_json = _json_loads(response_text)
+            except ValueError:
+                json_str = _extract_json_object(response_text)
+                workout_json = _json_loads(json_str) if json_str else None
+
+            if workout_json:
                 # Add metadata
                 workout_json["raw_request"] = user_request
                 workout_json["generated_at"] = datetime.now().isoformat()
                 workout_json["athlete_profile"] = profile_data
                 
-                print(f"Generated profile-based workout: {workout_json.get('title', 'Unknown')}")
-                
+                logger.debug("Generated profile-based workout: %s", workout_json.get('title', 'Unknown'))
+
+                _gen_cache_put(cache_key, workout_json)
+                _semantic_cache_put(sem_key, req_vec, workout_json)
                 return jsonify(success=True, workout=workout_json)
                 
             else:
                 return jsonify(success=False, error="Failed to generate structured workout"), 500
                 
         except Exception as openai_error:
-            print(f"OpenAI error: {openai_error}")
+            logger.exception("OpenAI error")
             return jsonify(success=False, error="Failed to generate workout"), 500
             
     except Exception as e:
-        print(f"Error in generate_from_profile: {e}")
+        logger.exception("Error in generate_from_profile")
+        return jsonify(success=False, error=str(e)), 500
+
+# Concurrency cap for batch generation fan-out
+_BATCH_MAX_CONCURRENT = 8
+
+async def _generate_variants(api_key, messages, variants):
+    """Fan out N completions concurrently, bounded by a semaphore.
+
+    N concurrent calls finish in roughly one call's latency instead of N.
+    Exceptions come back in-line (return_exceptions) so one failed variant
+    doesn't sink the batch.
+    """
+    sem = asyncio.Semaphore(_BATCH_MAX_CONCURRENT)
+    client = _get_async_openai(api_key)
+
+    async def one(i):
+        async with sem:
+            return await client.chat.completions.create(
+                model="gpt-4o-mini",
+                response_format={"type": "json_object"},
+                messages=messages,
+                temperature=min(0.7 + 0.1 * i, 1.1),
+                max_tokens=1500,
+            )
+
+    return await asyncio.gather(*(one(i) for i in range(variants)),
+                                return_exceptions=True)
+
+def _generate_variants_eventlet(api_key, messages, variants):
+    """Eventlet-process counterpart of _generate_variants.
+
+    Same fan-out semantics (bounded concurrency, exceptions in-line) on a
+    GreenPool, since the asyncio side-loop never starts under monkey_patch.
+    """
+    import eventlet
+    client = _get_openai(api_key)
+
+    def one(i):
+        try:
+            return client.chat.completions.create(
+                model="gpt-4o-mini",
+                response_format={"type": "json_object"},
+                messages=messages,
+                temperature=min(0.7 + 0.1 * i, 1.1),
+                max_tokens=1500,
+            )
+        except Exception as e:
+            return e
+
+    pool = eventlet.GreenPool(_BATCH_MAX_CONCURRENT)
+    return list(pool.imap(one, range(variants)))
+
+@app.route("/generate_batch", methods=["POST"])
+def generate_batch():
+    """Generate several workout variants concurrently from one profile."""
+    try:
+        # Check API key
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            return jsonify(success=False, error="OpenAI API key not configured"), 500
+
+        # Validate input
+        body = request.get_json() or {}
+        user_request = (body.get("request") or "").strip()
+        profile_data = body.get("profile", {})
+        variants = max(1, min(int(body.get("variants", 3)), _BATCH_MAX_CONCURRENT))
+
+        if not user_request:
+            return jsonify(success=False, error="Please describe the workout"), 400
+
+        if not profile_data:
+            return jsonify(success=False, error="Please provide athlete profile data"), 400
+
+        profile_blob = json.dumps(profile_data, sort_keys=True)
+        athlete_profile, constraints, json_schema = _profile_prompt(profile_blob)
+        duration = _parse_duration(user_request)
+
+        # Same system/user split as /generate_from_profile: static scaffold
+        # in the system message, dynamic ask in the user message.
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    "You are a treadmill run planner. Use the athlete profile below and obey constraints and schema. "
+                    "If any constraint conflicts, adjust speed first, then incline. Return valid JSON only.\n\n"
+                    f"{athlete_profile}\n\n{constraints}\n\n{json_schema}"
+                ),
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"USER REQUEST: {user_request}\n"
+                    f"TARGET DURATION: {duration} minutes\n\n"
+                    "Generate a structured treadmill workout that matches the user's request and follows all constraints."
+                ),
+            },
+        ]
+
+        if _EVENTLET_PATCHED:
+            completions = _generate_variants_eventlet(api_key, messages, variants)
+        else:
+            future = asyncio.run_coroutine_threadsafe(
+                _generate_variants(api_key, messages, variants), _ensure_async_loop())
+            completions = future.result()
+
+        workouts = []
+        for completion in completions:
+            if isinstance(completion, Exception):
+                logger.error("Batch variant failed: %s", completion)
+                continue
+            response_text = (completion.choices[0].message.content or "").strip()
+            try:
+                workout_json = _json_loads(response_text)
+            except ValueError:
+                json_str = _extract_json_object(response_text)
+                workout_json = _json_loads(json_str) if json_str else None
+            if workout_json:
+                workout_json["raw_request"] = user_request
+                workout_json["generated_at"] = datetime.now().isoformat()
+                workout_json["athlete_profile"] = profile_data
+                workouts.append(workout_json)
+
+        if not workouts:
+            return jsonify(success=False, error="Failed to generate workouts"), 500
+
+        return jsonify(success=True, workouts=workouts)
+
+    except Exception as e:
+        logger.exception("Error in generate_batch")
         return jsonify(success=False, error=str(e)), 500
 
 # Example function to create your specific profile
@@ -3138,7 +3656,7 @@ def create_user_profile():
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
-    print(f"Client connected: {request.sid}")
+    logger.debug("Client connected: %s", request.sid)
     emit('connected', {'message': 'Connected to HR broadcast'})
 
 @socketio.on('start_hr_stream')
@@ -3175,7 +3693,7 @@ def handle_start_hr_stream():
                 update_count += 1
                 socketio.sleep(1)  # Update every second
             except Exception as e:
-                print(f"Error in HR update loop: {e}")
+                logger.exception("Error in HR update loop")
                 socketio.sleep(5)  # Wait longer on error
                 update_count += 1
     
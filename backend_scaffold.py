@@ -79,12 +79,40 @@ Integration Notes
 
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Literal
 import uuid, time, random
-
-app = FastAPI(title="Treadmill Run Coach API (Scaffold)")
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+
+import numpy as np
+
+# Bounded stores: without eviction the in-memory dicts grow forever under
+# real load. Degrades to plain (unbounded) dicts if cachetools is missing.
+try:
+    from cachetools import TTLCache
+except ImportError:
+    TTLCache = None
+
+def _make_store(ttl_s: int):
+    if TTLCache is None:
+        return {}
+    return TTLCache(maxsize=10_000, ttl=ttl_s)
+
+# orjson-backed responses when available (markedly faster encode than stdlib
+# json); plain JSONResponse otherwise so the scaffold still runs without it.
+try:
+    import orjson  # noqa: F401 — ORJSONResponse needs it at render time
+    from fastapi.responses import ORJSONResponse as _ResponseClass
+except ImportError:
+    import json
+    orjson = None
+    from fastapi.responses import JSONResponse as _ResponseClass
+
+app = FastAPI(title="Treadmill Run Coach API (Scaffold)",
+              default_response_class=_ResponseClass)
 
 # -------------------------
 # Data Models
@@ -117,18 +145,80 @@ class SessionState(BaseModel):
 # -------------------------
 # In-memory stores (replace with DB later)
 # -------------------------
-_WORKOUTS: Dict[str, WorkoutTemplate] = {}
-_SESSIONS: Dict[str, SessionState] = {}
+# Sessions are stored as plain dicts: the hot GET /sessions/{sid} path ticks
+# many times a second, and returning the dict straight through the default
+# response class skips a full Pydantic revalidation per read. SessionState
+# documents the shape and validates nothing on this path.
+_WORKOUTS: Dict[str, WorkoutTemplate] = _make_store(6 * 3600)
+_SESSIONS: Dict[str, dict] = _make_store(12 * 3600)
+
+# Templates are immutable once created, so their JSON is rendered once at
+# insert time and GET /workouts/{id} serves the cached bytes without a
+# serialization pass.
+_WORKOUT_JSON: Dict[str, bytes] = _make_store(6 * 3600)
+
+def _dump_workout(w: WorkoutTemplate) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(w.model_dump())
+    return json.dumps(w.model_dump()).encode()
+
+# Timer bookkeeping is integer nanoseconds end to end: int arithmetic has no
+# accumulation drift over a long run, and conversion to float seconds happens
+# only in _session_view at the API boundary.
+NS_PER_S = 1_000_000_000
+
+def _now_ns() -> int:
+    return time.monotonic_ns()
+
+def _session_view(s: dict) -> dict:
+    """Seconds-denominated view of a session for API responses."""
+    return {
+        "id": s["id"],
+        "workout_id": s["workout_id"],
+        "status": s["status"],
+        "elapsed_s": s["elapsed_ns"] / NS_PER_S,
+        "segment_elapsed_s": s["segment_elapsed_ns"] / NS_PER_S,
+        "current_segment_index": s["current_segment_index"],
+    }
+
+# Prefix sums of segment durations (in ns) per workout id, built lazily so
+# _tick can find the current segment with one bisect instead of walking.
+_CUM_NS: Dict[str, List[int]] = _make_store(6 * 3600)
+
+def _cum_durations_ns(w: WorkoutTemplate) -> List[int]:
+    cum = _CUM_NS.get(w.id)
+    if cum is None:
+        cum = list(accumulate(seg.duration_s * NS_PER_S for seg in w.segments))
+        _CUM_NS[w.id] = cum
+    return cum
 
 # -------------------------
 # Utility: generation w/ seed
 # -------------------------
-STEADY_SPEEDS = [5.8, 6.0, 6.1, 6.3]
-PUSH_SPEEDS = [6.7, 6.9, 7.0, 7.1]
-INCLINES = [0, 1, 1, 2, 3]
+STEADY_DURATIONS = (120, 180, 240)
+PUSH_DURATIONS = (60, 90, 120)
+STEADY_SPEEDS = (5.8, 6.0, 6.1, 6.3)
+PUSH_SPEEDS = (6.7, 6.9, 7.0, 7.1)
+INCLINES = (0, 1, 1, 2, 3)
 
 def _generate_segments(total_s: int, seed: int) -> List[IntervalSegment]:
-    rnd = random.Random(seed)
+    # Generation is pure in (total_s, seed) and common durations/seeds recur,
+    # so serve copies out of an LRU-cached plan.
+    return [seg.model_copy() for seg in _generate_segments_cached(total_s, seed)]
+
+@lru_cache(maxsize=128)
+def _generate_segments_cached(total_s: int, seed: int) -> tuple:
+    # Pre-sample every draw the loop could need in one vectorized pass each;
+    # the loop below then only indexes into the arrays. n overshoots the
+    # worst case (shortest steady+push pair is 180s).
+    n = total_s // 60 + 4
+    rng = np.random.default_rng(seed)
+    d1s = rng.choice(STEADY_DURATIONS, n)
+    d2s = rng.choice(PUSH_DURATIONS, n)
+    steady_speeds = rng.choice(STEADY_SPEEDS, n)
+    push_speeds = rng.choice(PUSH_SPEEDS, n)
+    inclines = rng.choice(INCLINES, 2 * n)
+
     segs: List[IntervalSegment] = []
     idx = 0
     # warmup
@@ -137,17 +227,19 @@ def _generate_segments(total_s: int, seed: int) -> List[IntervalSegment]:
     idx += 1
     remain = max(0, total_s - warm - 300)  # leave room for cooldown if possible
     # alternating steady/push blocks
+    i = 0
     while remain > 0:
-        d1 = min(remain, rnd.choice([120, 180, 240]))
-        segs.append(IntervalSegment(index=idx, duration_s=d1, speed_mph=rnd.choice(STEADY_SPEEDS), incline_pct=rnd.choice(INCLINES), label="steady"))
+        d1 = min(remain, int(d1s[i]))
+        segs.append(IntervalSegment(index=idx, duration_s=d1, speed_mph=float(steady_speeds[i]), incline_pct=float(inclines[2 * i]), label="steady"))
         idx += 1
         remain -= d1
         if remain <= 0:
             break
-        d2 = min(remain, rnd.choice([60, 90, 120]))
-        segs.append(IntervalSegment(index=idx, duration_s=d2, speed_mph=rnd.choice(PUSH_SPEEDS), incline_pct=rnd.choice(INCLINES), label="push"))
+        d2 = min(remain, int(d2s[i]))
+        segs.append(IntervalSegment(index=idx, duration_s=d2, speed_mph=float(push_speeds[i]), incline_pct=float(inclines[2 * i + 1]), label="push"))
         idx += 1
         remain -= d2
+        i += 1
     # cooldown
     cool = min(300, max(60, total_s - sum(s.duration_s for s in segs)))
     if cool > 0:
@@ -155,7 +247,7 @@ def _generate_segments(total_s: int, seed: int) -> List[IntervalSegment]:
     # reindex
     for i, s in enumerate(segs):
         s.index = i
-    return segs
+    return tuple(segs)
 
 # -------------------------
 # Workouts API
@@ -176,14 +268,18 @@ def generate_workout(inputs: Dict):
         stats={"total_time_s": total_s},
     )
     _WORKOUTS[wid] = workout
+    _WORKOUT_JSON[wid] = _dump_workout(workout)
     return workout
 
-@app.get("/workouts/{workout_id}", response_model=WorkoutTemplate)
+@app.get("/workouts/{workout_id}")
 def get_workout(workout_id: str):
     w = _WORKOUTS.get(workout_id)
     if not w:
         raise HTTPException(404, "Workout not found")
-    return w
+    payload = _WORKOUT_JSON.get(workout_id)
+    if payload is None:  # workout inserted without going through the endpoint
+        payload = _WORKOUT_JSON[workout_id] = _dump_workout(w)
+    return Response(content=payload, media_type="application/json")
 
 @app.post("/workouts/{workout_id}/regenerate", response_model=WorkoutTemplate)
 def regenerate_workout(workout_id: str):
@@ -197,94 +293,109 @@ def regenerate_workout(workout_id: str):
 # -------------------------
 # Sessions API — server-authoritative timer
 # -------------------------
-@app.post("/sessions", response_model=SessionState)
+@app.post("/sessions")
 def create_session(workout_id: str):
     if workout_id not in _WORKOUTS:
         raise HTTPException(404, "Workout not found")
     sid = str(uuid.uuid4())
-    s = SessionState(id=sid, workout_id=workout_id)
+    s = {
+        "id": sid,
+        "workout_id": workout_id,
+        "status": "idle",
+        "elapsed_ns": 0,
+        "segment_elapsed_ns": 0,
+        "current_segment_index": 0,
+        "last_tick_ns": _now_ns(),
+    }
     _SESSIONS[sid] = s
-    return s
+    return _session_view(s)
 
-@app.post("/sessions/{sid}/start", response_model=SessionState)
+@app.post("/sessions/{sid}/start")
 def start_session(sid: str):
     s = _SESSIONS.get(sid)
     if not s:
         raise HTTPException(404, "Session not found")
-    s.status = "running"
-    s.last_tick_mono = time.monotonic()  # Set baseline time
-    return s
+    s["status"] = "running"
+    s["last_tick_ns"] = _now_ns()  # Set baseline time
+    return _session_view(s)
 
-@app.post("/sessions/{sid}/pause", response_model=SessionState)
+@app.post("/sessions/{sid}/pause")
 def pause_session(sid: str):
     s = _SESSIONS.get(sid)
     if not s:
         raise HTTPException(404, "Session not found")
     _tick(s)
-    s.status = "paused"
-    return s
+    s["status"] = "paused"
+    return _session_view(s)
 
-@app.post("/sessions/{sid}/resume", response_model=SessionState)
+@app.post("/sessions/{sid}/resume")
 def resume_session(sid: str):
     s = _SESSIONS.get(sid)
     if not s:
         raise HTTPException(404, "Session not found")
-    s.status = "running"
-    s.last_tick_mono = time.monotonic()  # Set baseline time
-    return s
+    s["status"] = "running"
+    s["last_tick_ns"] = _now_ns()  # Set baseline time
+    return _session_view(s)
 
-@app.post("/sessions/{sid}/skip", response_model=SessionState)
+@app.post("/sessions/{sid}/skip")
 def skip_segment(sid: str):
     s = _SESSIONS.get(sid)
     if not s:
         raise HTTPException(404, "Session not found")
     _tick(s)
-    s.current_segment_index += 1
-    s.segment_elapsed_s = 0
-    return s
+    s["current_segment_index"] += 1
+    s["segment_elapsed_ns"] = 0
+    return _session_view(s)
 
-@app.post("/sessions/{sid}/back", response_model=SessionState)
+@app.post("/sessions/{sid}/back")
 def back_segment(sid: str):
     s = _SESSIONS.get(sid)
     if not s:
         raise HTTPException(404, "Session not found")
     _tick(s)
-    s.current_segment_index = max(0, s.current_segment_index - 1)
-    s.segment_elapsed_s = 0
-    return s
+    s["current_segment_index"] = max(0, s["current_segment_index"] - 1)
+    s["segment_elapsed_ns"] = 0
+    return _session_view(s)
 
-@app.get("/sessions/{sid}", response_model=SessionState)
+@app.get("/sessions/{sid}")
 def get_state(sid: str):
     s = _SESSIONS.get(sid)
     if not s:
         raise HTTPException(404, "Session not found")
     _tick(s)
-    return s
+    return _session_view(s)
 
 # -------------------------
 # Timer core — continuous elapsed across intervals
 # -------------------------
-def _tick(s: SessionState) -> None:
-    if s.status != "running":
+def _tick(s: dict) -> None:
+    if s["status"] != "running":
         return
-    now = time.monotonic()
-    delta = max(0, now - s.last_tick_mono)
+    now = _now_ns()
+    delta = max(0, now - s["last_tick_ns"])
     if delta > 0:
-        s.elapsed_s += delta
-        s.segment_elapsed_s += delta
+        s["elapsed_ns"] += delta
+        s["segment_elapsed_ns"] += delta
 
-        w = _WORKOUTS.get(s.workout_id)
+        w = _WORKOUTS.get(s["workout_id"])
         if w:
-            segs = w.segments
-            while s.current_segment_index < len(segs) and s.segment_elapsed_s >= segs[s.current_segment_index].duration_s:
-                s.segment_elapsed_s -= segs[s.current_segment_index].duration_s
-                s.current_segment_index += 1
-            if s.current_segment_index >= len(segs):
+            cum = _cum_durations_ns(w)
+            idx = s["current_segment_index"]
+            if idx < len(cum):
+                # Absolute position in the plan, then one O(log n) bisect
+                # instead of stepping a segment per loop iteration.
+                absolute = (cum[idx - 1] if idx else 0) + s["segment_elapsed_ns"]
+                idx = bisect_right(cum, absolute)
+            if idx >= len(cum):
                 # Completed
-                s.status = "completed"
-                s.segment_elapsed_s = 0
-                s.elapsed_s = float(w.stats.get("total_time_s", s.elapsed_s))
-        s.last_tick_mono = now
+                s["status"] = "completed"
+                s["current_segment_index"] = idx
+                s["segment_elapsed_ns"] = 0
+                s["elapsed_ns"] = int(w.stats.get("total_time_s", 0)) * NS_PER_S or s["elapsed_ns"]
+            else:
+                s["current_segment_index"] = idx
+                s["segment_elapsed_ns"] = absolute - (cum[idx - 1] if idx else 0)
+        s["last_tick_ns"] = now
 
 # -------------------------
 # Dev helper: run with uvicorn
@@ -0,0 +1,18 @@
+"""Shared fixtures for the backend scaffold test suite."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend_scaffold import app
+
+
+@pytest.fixture(scope="session")
+def scaffold_client():
+    """One in-process ASGI client per session instead of per module import.
+
+    httpx's ASGITransport is async-only, so a plain sync httpx.Client cannot
+    drive it directly; TestClient is the sync httpx client over the same
+    in-process ASGI transport.
+    """
+    with TestClient(app) as client:
+        yield client
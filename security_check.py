@@ -9,13 +9,23 @@ import subprocess
 import sys
 import os
 
+import pytest
+
+# Direct path to the running interpreter: no PATH lookup, no pyenv/conda
+# shim layer, and subprocesses share the parent's environment.
+PY = sys.executable
+
+# True when running inside a virtualenv/venv (legacy or PEP 405).
+IN_VENV = (hasattr(sys, "real_prefix")
+           or getattr(sys, "base_prefix", sys.prefix) != sys.prefix)
+
 def run_command(command, description):
-    """Run a command and handle errors."""
+    """Run a command given as an argv list and handle errors."""
     print(f"\n🔍 {description}")
     print("=" * 50)
     
     try:
-        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        result = subprocess.run(command, capture_output=True, text=True)
         print(result.stdout)
         if result.stderr:
             print("Warnings/Errors:")
@@ -31,52 +41,46 @@ def main():
     print("=" * 50)
     
     # Check if virtual environment is activated
-    if not hasattr(sys, 'real_prefix') and not (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix):
+    if not IN_VENV:
         print("⚠️  Warning: Virtual environment not detected. Consider activating it first.")
         print("   Run: source venv/bin/activate")
     
     success_count = 0
-    total_checks = 5
-    
+    total_checks = 3
+
     # 1. Security audit on dependencies
-    if run_command("python -m pip_audit --requirement requirements.txt", 
+    if run_command([PY, "-m", "pip_audit", "--requirement", "requirements.txt"],
                    "Checking for security vulnerabilities in dependencies"):
         success_count += 1
         print("✅ Dependencies security check passed")
     else:
         print("❌ Dependencies security check failed")
-    
+
     # 2. Security audit on dev dependencies
-    if run_command("python -m pip_audit --requirement requirements-dev.txt", 
+    if run_command([PY, "-m", "pip_audit", "--requirement", "requirements-dev.txt"],
                    "Checking for security vulnerabilities in dev dependencies"):
         success_count += 1
         print("✅ Dev dependencies security check passed")
     else:
         print("❌ Dev dependencies security check failed")
-    
-    # 3. Run security tests
-    if run_command("python -m pytest tests/test_security.py -v", 
-                   "Running security tests"):
-        success_count += 1
-        print("✅ Security tests passed")
-    else:
-        print("❌ Security tests failed")
-    
-    # 4. Run app functionality tests
-    if run_command("python -m pytest tests/test_app.py -v", 
-                   "Running app functionality tests"):
-        success_count += 1
-        print("✅ App functionality tests passed")
-    else:
-        print("❌ App functionality tests failed")
-    
-    # 5. Run advanced security tests
-    if run_command("python -m pytest tests/test_advanced_security.py -v", 
-                   "Running advanced security tests"):
+
+    # 3. Run the security, app functionality and advanced security tests in a
+    # single in-process pytest session: one interpreter, one collection pass.
+    print("\n🔍 Running security and app test suites")
+    print("=" * 50)
+    if pytest.main([
+        "tests/test_security.py",
+        "tests/test_app.py",
+        "tests/test_advanced_security.py",
+        "-v",
+        "-n", "auto",
+        "--dist=loadfile",
+        "-p", "no:cacheprovider",
+    ]) == 0:
         success_count += 1
-        print("✅ Advanced security tests passed")
+        print("✅ Security and app test suites passed")
     else:
-        print("❌ Advanced security tests failed")
+        print("❌ Security and app test suites failed")
     
     # Summary
     print("\n" + "=" * 50)
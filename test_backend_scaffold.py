@@ -8,32 +8,33 @@ Tests the acceptance criteria:
 - Regeneration after selection returns a new workout id; history remains
 """
 
-import pytest
-import time
-from backend_scaffold import app, _WORKOUTS, _SESSIONS, _generate_segments
-from fastapi.testclient import TestClient
+import copy
 
-client = TestClient(app)
+import pytest
+import backend_scaffold
+from backend_scaffold import _WORKOUTS, _SESSIONS, _generate_segments, NS_PER_S
 
 class TestWorkoutGeneration:
     """Test workout generation and regeneration functionality"""
-    
-    def setup_method(self):
-        """Clear stores before each test"""
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, scaffold_client):
+        """Bind the shared client and clear stores before each test"""
+        self.client = scaffold_client
         _WORKOUTS.clear()
         _SESSIONS.clear()
-    
+
     def test_different_durations_produce_different_workouts(self):
         """Test that 30 vs 60 min workouts differ"""
         # Generate 30-minute workout
         inputs_30 = {"duration_min": 30}
-        response_30 = client.post("/workouts/generate", json=inputs_30)
+        response_30 = self.client.post("/workouts/generate", json=inputs_30)
         assert response_30.status_code == 200
         workout_30 = response_30.json()
         
         # Generate 60-minute workout
         inputs_60 = {"duration_min": 60}
-        response_60 = client.post("/workouts/generate", json=inputs_60)
+        response_60 = self.client.post("/workouts/generate", json=inputs_60)
         assert response_60.status_code == 200
         workout_60 = response_60.json()
         
@@ -48,12 +49,12 @@ class TestWorkoutGeneration:
         inputs = {"duration_min": 45, "seed": 12345}
         
         # Generate first workout
-        response1 = client.post("/workouts/generate", json=inputs)
+        response1 = self.client.post("/workouts/generate", json=inputs)
         assert response1.status_code == 200
         workout1 = response1.json()
         
         # Generate second workout with same inputs
-        response2 = client.post("/workouts/generate", json=inputs)
+        response2 = self.client.post("/workouts/generate", json=inputs)
         assert response2.status_code == 200
         workout2 = response2.json()
         
@@ -69,8 +70,8 @@ class TestWorkoutGeneration:
         inputs2 = {"duration_min": 45, "seed": 67890}
         
         # Generate workouts with different seeds
-        response1 = client.post("/workouts/generate", json=inputs1)
-        response2 = client.post("/workouts/generate", json=inputs2)
+        response1 = self.client.post("/workouts/generate", json=inputs1)
+        response2 = self.client.post("/workouts/generate", json=inputs2)
         
         assert response1.status_code == 200
         assert response2.status_code == 200
@@ -86,13 +87,13 @@ class TestWorkoutGeneration:
         """Test regeneration creates new workout without overwriting history"""
         # Create initial workout
         inputs = {"duration_min": 30}
-        response1 = client.post("/workouts/generate", json=inputs)
+        response1 = self.client.post("/workouts/generate", json=inputs)
         assert response1.status_code == 200
         original_workout = response1.json()
         original_id = original_workout["id"]
         
         # Regenerate workout
-        response2 = client.post(f"/workouts/{original_id}/regenerate")
+        response2 = self.client.post(f"/workouts/{original_id}/regenerate")
         assert response2.status_code == 200
         new_workout = response2.json()
         new_id = new_workout["id"]
@@ -101,42 +102,51 @@ class TestWorkoutGeneration:
         assert new_id != original_id
         
         # Verify original workout still exists
-        response3 = client.get(f"/workouts/{original_id}")
+        response3 = self.client.get(f"/workouts/{original_id}")
         assert response3.status_code == 200
         assert response3.json()["id"] == original_id
         
         # Verify new workout exists
-        response4 = client.get(f"/workouts/{new_id}")
+        response4 = self.client.get(f"/workouts/{new_id}")
         assert response4.status_code == 200
         assert response4.json()["id"] == new_id
     
     def test_get_workout_not_found(self):
         """Test 404 for non-existent workout"""
-        response = client.get("/workouts/nonexistent-id")
+        response = self.client.get("/workouts/nonexistent-id")
         assert response.status_code == 404
     
     def test_regenerate_workout_not_found(self):
         """Test 404 for regenerating non-existent workout"""
-        response = client.post("/workouts/nonexistent-id/regenerate")
+        response = self.client.post("/workouts/nonexistent-id/regenerate")
         assert response.status_code == 404
 
 class TestSessionManagement:
     """Test session creation and management"""
-    
-    def setup_method(self):
-        """Clear stores and create a test workout"""
+
+    @pytest.fixture(scope="class", autouse=True)
+    def _template(self, request, scaffold_client):
+        """Generate one template workout per class"""
         _WORKOUTS.clear()
         _SESSIONS.clear()
-        
-        # Create a test workout
-        inputs = {"duration_min": 30}
-        response = client.post("/workouts/generate", json=inputs)
+        response = scaffold_client.post("/workouts/generate", json={"duration_min": 30})
         assert response.status_code == 200
-        self.workout_id = response.json()["id"]
+        wid = response.json()["id"]
+        request.cls._template_workout_id = wid
+        request.cls._template_workout = copy.deepcopy(_WORKOUTS[wid])
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, scaffold_client):
+        """Bind the shared client and restore the template workout"""
+        self.client = scaffold_client
+        _WORKOUTS.clear()
+        _SESSIONS.clear()
+        self.workout_id = self._template_workout_id
+        _WORKOUTS[self.workout_id] = copy.deepcopy(self._template_workout)
     
     def test_create_session(self):
         """Test session creation"""
-        response = client.post("/sessions", params={"workout_id": self.workout_id})
+        response = self.client.post("/sessions", params={"workout_id": self.workout_id})
         assert response.status_code == 200
         
         session = response.json()
@@ -148,49 +158,72 @@ class TestSessionManagement:
     
     def test_create_session_invalid_workout(self):
         """Test session creation with invalid workout ID"""
-        response = client.post("/sessions", params={"workout_id": "invalid-id"})
+        response = self.client.post("/sessions", params={"workout_id": "invalid-id"})
         assert response.status_code == 404
 
 class TestTimerBehavior:
     """Test timer behavior and session state management"""
-    
-    def setup_method(self):
-        """Clear stores and create a test workout and session"""
+
+    @pytest.fixture(scope="class", autouse=True)
+    def _template(self, request, scaffold_client):
+        """Generate one template workout and session per class"""
         _WORKOUTS.clear()
         _SESSIONS.clear()
-        
+
         # Create a test workout with short segments for testing
         inputs = {"duration_min": 5}  # 5 minutes for faster testing
-        response = client.post("/workouts/generate", json=inputs)
+        response = scaffold_client.post("/workouts/generate", json=inputs)
         assert response.status_code == 200
-        self.workout_id = response.json()["id"]
-        
+        wid = response.json()["id"]
+
         # Create a session
-        response = client.post("/sessions", params={"workout_id": self.workout_id})
+        response = scaffold_client.post("/sessions", params={"workout_id": wid})
         assert response.status_code == 200
-        self.session_id = response.json()["id"]
-    
+        sid = response.json()["id"]
+
+        request.cls._template_workout_id = wid
+        request.cls._template_session_id = sid
+        request.cls._template_workout = copy.deepcopy(_WORKOUTS[wid])
+        request.cls._template_session = copy.deepcopy(_SESSIONS[sid])
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, scaffold_client, monkeypatch):
+        """Bind the shared client, fake the clock and restore the templates"""
+        self.client = scaffold_client
+        self._clock_ns = [0]
+        monkeypatch.setattr(backend_scaffold, "_now_ns", lambda: self._clock_ns[0])
+        _WORKOUTS.clear()
+        _SESSIONS.clear()
+        self.workout_id = self._template_workout_id
+        self.session_id = self._template_session_id
+        _WORKOUTS[self.workout_id] = copy.deepcopy(self._template_workout)
+        _SESSIONS[self.session_id] = copy.deepcopy(self._template_session)
+
+    def advance(self, seconds):
+        """Advance the fake monotonic clock"""
+        self._clock_ns[0] += int(seconds * NS_PER_S)
+
     def test_timer_continuous_elapsed_no_reset(self):
         """Test that elapsed_s never resets during a run"""
         # Start session
-        response = client.post(f"/sessions/{self.session_id}/start")
+        response = self.client.post(f"/sessions/{self.session_id}/start")
         assert response.status_code == 200
         
-        # Wait a bit
-        time.sleep(0.2)
-        
+        # Advance virtual time
+        self.advance(0.2)
+
         # Check state
-        response = client.get(f"/sessions/{self.session_id}")
+        response = self.client.get(f"/sessions/{self.session_id}")
         assert response.status_code == 200
         state1 = response.json()
         elapsed1 = state1["elapsed_s"]
         assert elapsed1 > 0
-        
-        # Wait more
-        time.sleep(0.2)
+
+        # Advance further
+        self.advance(0.2)
         
         # Check state again
-        response = client.get(f"/sessions/{self.session_id}")
+        response = self.client.get(f"/sessions/{self.session_id}")
         assert response.status_code == 200
         state2 = response.json()
         elapsed2 = state2["elapsed_s"]
@@ -199,17 +232,17 @@ class TestTimerBehavior:
         assert elapsed2 > elapsed1
         
         # Pause and resume
-        response = client.post(f"/sessions/{self.session_id}/pause")
+        response = self.client.post(f"/sessions/{self.session_id}/pause")
         assert response.status_code == 200
         
-        response = client.post(f"/sessions/{self.session_id}/resume")
+        response = self.client.post(f"/sessions/{self.session_id}/resume")
         assert response.status_code == 200
-        
-        # Wait more
-        time.sleep(0.2)
+
+        # Advance further
+        self.advance(0.2)
         
         # Check state again
-        response = client.get(f"/sessions/{self.session_id}")
+        response = self.client.get(f"/sessions/{self.session_id}")
         assert response.status_code == 200
         state3 = response.json()
         elapsed3 = state3["elapsed_s"]
@@ -220,28 +253,28 @@ class TestTimerBehavior:
     def test_segment_elapsed_resets_on_segment_change(self):
         """Test that segment_elapsed_s resets when segments change"""
         # Start session
-        response = client.post(f"/sessions/{self.session_id}/start")
+        response = self.client.post(f"/sessions/{self.session_id}/start")
         assert response.status_code == 200
         
         # Get initial state
-        response = client.get(f"/sessions/{self.session_id}")
+        response = self.client.get(f"/sessions/{self.session_id}")
         assert response.status_code == 200
         initial_state = response.json()
         initial_segment = initial_state["current_segment_index"]
         initial_segment_elapsed = initial_state["segment_elapsed_s"]
         
         # Skip to next segment
-        response = client.post(f"/sessions/{self.session_id}/skip")
+        response = self.client.post(f"/sessions/{self.session_id}/skip")
         assert response.status_code == 200
         
         # Check state
-        response = client.get(f"/sessions/{self.session_id}")
+        response = self.client.get(f"/sessions/{self.session_id}")
         assert response.status_code == 200
         new_state = response.json()
         
         # Verify segment changed and segment_elapsed reset
         assert new_state["current_segment_index"] == initial_segment + 1
-        assert new_state["segment_elapsed_s"] < 0.1  # Small amount of time may have passed
+        assert new_state["segment_elapsed_s"] == 0  # Virtual clock has not advanced
         
         # Verify total elapsed continued
         assert new_state["elapsed_s"] >= initial_state["elapsed_s"]
@@ -249,7 +282,7 @@ class TestTimerBehavior:
     def test_session_completion(self):
         """Test session completion when all segments are done"""
         # Start session
-        response = client.post(f"/sessions/{self.session_id}/start")
+        response = self.client.post(f"/sessions/{self.session_id}/start")
         assert response.status_code == 200
         
         # Skip through all segments
@@ -257,11 +290,14 @@ class TestTimerBehavior:
         num_segments = len(workout.segments)
         
         for _ in range(num_segments):
-            response = client.post(f"/sessions/{self.session_id}/skip")
+            response = self.client.post(f"/sessions/{self.session_id}/skip")
             assert response.status_code == 200
-        
+
+        # Completion is detected on the next tick, so nudge the clock forward
+        self.advance(0.01)
+
         # Check final state
-        response = client.get(f"/sessions/{self.session_id}")
+        response = self.client.get(f"/sessions/{self.session_id}")
         assert response.status_code == 200
         final_state = response.json()
         
@@ -272,51 +308,53 @@ class TestTimerBehavior:
     def test_back_segment(self):
         """Test going back to previous segment"""
         # Start session
-        response = client.post(f"/sessions/{self.session_id}/start")
+        response = self.client.post(f"/sessions/{self.session_id}/start")
         assert response.status_code == 200
         
         # Skip to next segment
-        response = client.post(f"/sessions/{self.session_id}/skip")
+        response = self.client.post(f"/sessions/{self.session_id}/skip")
         assert response.status_code == 200
         
         # Check we're on segment 1
-        response = client.get(f"/sessions/{self.session_id}")
+        response = self.client.get(f"/sessions/{self.session_id}")
         assert response.status_code == 200
         state = response.json()
         assert state["current_segment_index"] == 1
         
         # Go back
-        response = client.post(f"/sessions/{self.session_id}/back")
+        response = self.client.post(f"/sessions/{self.session_id}/back")
         assert response.status_code == 200
         
         # Check we're back on segment 0
-        response = client.get(f"/sessions/{self.session_id}")
+        response = self.client.get(f"/sessions/{self.session_id}")
         assert response.status_code == 200
         state = response.json()
         assert state["current_segment_index"] == 0
-        assert state["segment_elapsed_s"] < 0.1  # Small amount of time may have passed
+        assert state["segment_elapsed_s"] == 0  # Virtual clock has not advanced
     
     def test_back_segment_at_beginning(self):
         """Test going back when already at first segment"""
         # Start session
-        response = client.post(f"/sessions/{self.session_id}/start")
+        response = self.client.post(f"/sessions/{self.session_id}/start")
         assert response.status_code == 200
         
         # Try to go back
-        response = client.post(f"/sessions/{self.session_id}/back")
+        response = self.client.post(f"/sessions/{self.session_id}/back")
         assert response.status_code == 200
         
         # Check we're still on segment 0
-        response = client.get(f"/sessions/{self.session_id}")
+        response = self.client.get(f"/sessions/{self.session_id}")
         assert response.status_code == 200
         state = response.json()
         assert state["current_segment_index"] == 0
 
 class TestErrorHandling:
     """Test error handling for invalid operations"""
-    
-    def setup_method(self):
-        """Clear stores"""
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, scaffold_client):
+        """Bind the shared client and clear stores"""
+        self.client = scaffold_client
         _WORKOUTS.clear()
         _SESSIONS.clear()
     
@@ -327,71 +365,47 @@ class TestErrorHandling:
         # Test all session operations
         operations = ["start", "pause", "resume", "skip", "back"]
         for op in operations:
-            response = client.post(f"/sessions/{session_id}/{op}")
+            response = self.client.post(f"/sessions/{session_id}/{op}")
             assert response.status_code == 404
         
         # Test get state
-        response = client.get(f"/sessions/{session_id}")
+        response = self.client.get(f"/sessions/{session_id}")
         assert response.status_code == 404
 
 class TestSegmentGeneration:
     """Test the segment generation logic directly"""
-    
-    def test_generate_segments_deterministic(self):
-        """Test that segment generation is deterministic with same seed"""
+
+    @pytest.mark.parametrize("seed", [12345, 67890, 11111])
+    def test_generate_segments_invariants(self, seed):
+        """Determinism, seed sensitivity, duration and structure per seed"""
         total_s = 1800  # 30 minutes
-        seed = 12345
-        
-        segments1 = _generate_segments(total_s, seed)
-        segments2 = _generate_segments(total_s, seed)
-        
-        # Verify identical segments
-        assert len(segments1) == len(segments2)
-        for s1, s2 in zip(segments1, segments2):
+
+        segments = _generate_segments(total_s, seed)
+
+        # Deterministic: a second call with the same seed is identical
+        repeat = _generate_segments(total_s, seed)
+        assert len(segments) == len(repeat)
+        for s1, s2 in zip(segments, repeat):
             assert s1.duration_s == s2.duration_s
             assert s1.speed_mph == s2.speed_mph
             assert s1.incline_pct == s2.incline_pct
             assert s1.label == s2.label
-    
-    def test_generate_segments_different_seeds(self):
-        """Test that different seeds produce different segments"""
-        total_s = 1800  # 30 minutes
-        
-        segments1 = _generate_segments(total_s, 12345)
-        segments2 = _generate_segments(total_s, 67890)
-        
-        # Verify different segments (at least some differences)
-        assert segments1 != segments2
-    
-    def test_generate_segments_total_duration(self):
-        """Test that generated segments sum to approximately total duration"""
-        total_s = 1800  # 30 minutes
-        seed = 12345
-        
-        segments = _generate_segments(total_s, seed)
+
+        # A different seed produces a different plan
+        assert segments != _generate_segments(total_s, seed + 1)
+
+        # Segments sum close to total_s (within 10% tolerance)
         total_generated = sum(s.duration_s for s in segments)
-        
-        # Should be close to total_s (within 10% tolerance)
         assert abs(total_generated - total_s) <= total_s * 0.1
-    
-    def test_generate_segments_structure(self):
-        """Test that generated segments have proper structure"""
-        total_s = 1800  # 30 minutes
-        seed = 12345
-        
-        segments = _generate_segments(total_s, seed)
-        
+
         # Should have at least warmup and cooldown
         labels = [s.label for s in segments]
         assert "warmup" in labels
         assert "cooldown" in labels
-        
-        # Should have proper indexing
+
+        # Proper indexing plus reasonable speeds and inclines
         for i, segment in enumerate(segments):
             assert segment.index == i
-        
-        # Should have reasonable speeds and inclines
-        for segment in segments:
             assert 3.0 <= segment.speed_mph <= 8.0
             assert 0 <= segment.incline_pct <= 5.0
 
@@ -10,7 +10,7 @@ def _import_app_module():
     for name in candidates:
         try:
             return importlib.import_module(name)
-        except Exception as e:
+        except ImportError as e:
             last_err = e
     raise last_err or ImportError("Could not import app module (tried app.py, wsgi.py, main.py)")
 
@@ -24,30 +24,45 @@ def flask_app():
     mod: ModuleType = _import_app_module()
     # App instance at module level
     app = getattr(mod, "app", None)
-    if app is not None:
-        return app
-    # Factory
-    factory = getattr(mod, "create_app", None)
-    if callable(factory):
-        return factory()
-    raise RuntimeError("Neither `app` nor `create_app()` found in your entry module.")
+    if app is None:
+        # Factory
+        factory = getattr(mod, "create_app", None)
+        if not callable(factory):
+            raise RuntimeError("Neither `app` nor `create_app()` found in your entry module.")
+        app = factory()
+    app.testing = True
+    return app
+
+@pytest.fixture(scope="session")
+def test_dirs(tmp_path_factory):
+    """Create the data/log directories once per session."""
+    data_dir = tmp_path_factory.mktemp("data")
+    log_dir = tmp_path_factory.mktemp("logs")
+    return data_dir, log_dir
 
 @pytest.fixture(autouse=True)
-def test_env(tmp_path, monkeypatch):
+def test_env(test_dirs, monkeypatch):
     """Set safe defaults for tests (no real secrets)."""
+    data_dir, log_dir = test_dirs
     monkeypatch.setenv("FLASK_SECRET_KEY", "test_" + "a"*64)
     monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
     monkeypatch.setenv("WHOOP_CLIENT_ID", "whoop-test-id")
     monkeypatch.setenv("WHOOP_CLIENT_SECRET", "whoop-test-secret")
     monkeypatch.setenv("ENCRYPTION_KEY", "mzU2Y2x3eGt5enFCR1ZKU2RsRkRkM2hVeHNWQ0RvR0g=")  # dummy Fernet key (base64)
-    monkeypatch.setenv("DATA_DIR", str(tmp_path / "data"))
-    (tmp_path / "data").mkdir(parents=True, exist_ok=True)
-    monkeypatch.setenv("LOG_DIR", str(tmp_path / "logs"))
-    (tmp_path / "logs").mkdir(parents=True, exist_ok=True)
+    monkeypatch.setenv("DATA_DIR", str(data_dir))
+    monkeypatch.setenv("LOG_DIR", str(log_dir))
     # Avoid HTTPS redirect during tests unless explicitly enabled
     monkeypatch.setenv("FLASK_ENV", "development")
 
 @pytest.fixture
 def client(flask_app):
-    flask_app.testing = True
     return flask_app.test_client()
+
+@pytest.fixture(scope="session")
+def home_response(flask_app):
+    """One shared GET / response for the read-only header/body tests.
+
+    Rendering the home page dominates those tests' runtime, and none of
+    them mutate anything, so issuing the request once per session is safe.
+    """
+    return flask_app.test_client().get("/")
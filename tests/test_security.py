@@ -4,90 +4,96 @@ import sqlite3
 import pytest
 from http import HTTPStatus
 
-def test_basic_security_headers(client):
+def test_basic_security_headers(home_response):
     """Test that basic security headers are present."""
-    resp = client.get("/")
-    headers = resp.headers
-    
+    headers = home_response.headers
+
     # Check for basic security headers
-    assert "X-Content-Type-Options" in headers or resp.status_code == 404
+    assert "X-Content-Type-Options" in headers or home_response.status_code == 404
     # Note: These headers might not be present in a basic Flask app
     # but we check that the app responds properly
 
-def test_no_sensitive_data_in_response(client):
+def test_no_sensitive_data_in_response(home_response):
     """Test that sensitive data is not exposed in responses."""
-    resp = client.get("/")
-    
     # Check that common sensitive patterns are not in response
-    response_text = resp.get_data(as_text=True)
-    
-    # More specific patterns that indicate actual sensitive data exposure
-    sensitive_patterns = [
-        "sk-test",  # API keys (more specific)
-        "api_key=",  # API key parameters
-        "secret=",   # Secret parameters
-        "token=",    # Token parameters
-        "password=", # Password parameters
-        "whoop_client_secret",  # Specific to this app
-        "flask_secret_key",     # Specific to this app
-    ]
-    
-    for pattern in sensitive_patterns:
+    response_text = home_response.get_data(as_text=True)
+
+    for pattern in SENSITIVE_PATTERNS:
         assert pattern not in response_text.lower(), f"Sensitive pattern '{pattern}' found in response"
 
-def test_sql_injection_resistance(client):
+# Pattern and payload lists used by the tests below; module scope so
+# they're built once at import, not per test.
+
+# More specific patterns that indicate actual sensitive data exposure
+SENSITIVE_PATTERNS = (
+    "sk-test",  # API keys (more specific)
+    "api_key=",  # API key parameters
+    "secret=",   # Secret parameters
+    "token=",    # Token parameters
+    "password=", # Password parameters
+    "whoop_client_secret",  # Specific to this app
+    "flask_secret_key",     # Specific to this app
+)
+
+DB_INDICATORS = (
+    "sqlite://",
+    "mysql://",
+    "postgresql://",
+    "database_url",
+    "connection_string",
+)
+SQL_INJECTION_PAYLOADS = [
+    "'; DROP TABLE users; --",
+    "1' OR '1'='1",
+    "'; INSERT INTO users VALUES ('hacker', 'password'); --"
+]
+
+# Look for actual SQL error patterns, not CSS properties
+SQL_ERROR_INDICATORS = [
+    "sqlite error",
+    "mysql error",
+    "postgresql error",
+    "syntax error",
+    "table doesn't exist",
+    "column doesn't exist",
+    "sql error",
+    "database error"
+]
+
+XSS_PAYLOADS = [
+    "<script>alert('xss')</script>",
+    "javascript:alert('xss')",
+    "<img src=x onerror=alert('xss')>",
+    "';alert('xss');//"
+]
+
+@pytest.mark.parametrize("dangerous_input", SQL_INJECTION_PAYLOADS)
+def test_sql_injection_resistance(client, dangerous_input):
     """Test basic SQL injection resistance."""
-    # Test with potentially dangerous input
-    dangerous_inputs = [
-        "'; DROP TABLE users; --",
-        "1' OR '1'='1",
-        "'; INSERT INTO users VALUES ('hacker', 'password'); --"
-    ]
-    
-    for dangerous_input in dangerous_inputs:
-        # Try to access with dangerous input
-        resp = client.get(f"/?q={dangerous_input}")
-        # Should not crash or expose database errors
-        assert resp.status_code in [200, 404, 400, 500]
-        
-        # Check that no SQL errors are exposed
-        response_text = resp.get_data(as_text=True).lower()
-        
-        # Look for actual SQL error patterns, not CSS properties
-        sql_error_indicators = [
-            "sqlite error",
-            "mysql error", 
-            "postgresql error",
-            "syntax error",
-            "table doesn't exist",
-            "column doesn't exist",
-            "sql error",
-            "database error"
-        ]
-        
-        for indicator in sql_error_indicators:
-            assert indicator not in response_text, f"SQL error indicator '{indicator}' found in response"
-
-def test_xss_protection(client):
+    # Try to access with dangerous input
+    resp = client.get(f"/?q={dangerous_input}")
+    # Should not crash or expose database errors
+    assert resp.status_code in [200, 404, 400, 500]
+
+    # Check that no SQL errors are exposed
+    response_text = resp.get_data(as_text=True).lower()
+
+    for indicator in SQL_ERROR_INDICATORS:
+        assert indicator not in response_text, f"SQL error indicator '{indicator}' found in response"
+
+@pytest.mark.parametrize("payload", XSS_PAYLOADS)
+def test_xss_protection(client, payload):
     """Test basic XSS protection."""
-    # Test with potentially dangerous input
-    xss_payloads = [
-        "<script>alert('xss')</script>",
-        "javascript:alert('xss')",
-        "<img src=x onerror=alert('xss')>",
-        "';alert('xss');//"
-    ]
-    
-    for payload in xss_payloads:
-        resp = client.get(f"/?q={payload}")
+    resp = client.get(f"/?q={payload}")
+
+    # Check that user-provided script tags are properly escaped
+    # Note: The app may have legitimate inline scripts, so we check for proper escaping
+    if "<script>alert('xss')</script>" in payload:
+        # Only decode the body when we actually scan it
         response_text = resp.get_data(as_text=True)
-        
-        # Check that user-provided script tags are properly escaped
-        # Note: The app may have legitimate inline scripts, so we check for proper escaping
-        if "<script>alert('xss')</script>" in payload:
-            # User input should be escaped, not executed
-            assert "&lt;script&gt;alert('xss')&lt;/script&gt;" in response_text or \
-                   "<script>alert('xss')</script>" not in response_text
+        # User input should be escaped, not executed
+        assert "&lt;script&gt;alert('xss')&lt;/script&gt;" in response_text or \
+               "<script>alert('xss')</script>" not in response_text
 
 def test_csrf_protection_basic(client):
     """Test basic CSRF protection for POST requests."""
@@ -146,22 +152,14 @@ def test_input_validation(client):
     resp = client.get(f"/?q={special_chars}")
     assert resp.status_code in [200, 400, 404]
 
-def test_database_connection_security(client):
+def test_database_connection_security(home_response):
     """Test that database connections are handled securely."""
     # This test assumes your app uses a database
     # We'll just test that the app doesn't crash on database operations
-    resp = client.get("/")
-    assert resp.status_code in [200, 404, 500]
-    
+    assert home_response.status_code in [200, 404, 500]
+
     # Check that no database connection strings are exposed
-    response_text = resp.get_data(as_text=True).lower()
-    db_indicators = [
-        "sqlite://",
-        "mysql://",
-        "postgresql://",
-        "database_url",
-        "connection_string"
-    ]
-    
-    for indicator in db_indicators:
+    response_text = home_response.get_data(as_text=True).lower()
+
+    for indicator in DB_INDICATORS:
         assert indicator not in response_text, f"Database indicator '{indicator}' found in response"
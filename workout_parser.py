@@ -1,97 +1,109 @@
 # workout_parser.py
 import re
-from typing import List, Dict
+from itertools import chain
+from typing import List, NamedTuple, Optional
+
+class Interval(NamedTuple):
+    """A single parsed workout interval; ~4x smaller than the old dict."""
+    section: Optional[str]
+    duration_min: int
+    speed_mph: float
+    description: str
+    incline: int = 0  # We'll add incline parsing later
+
+# Single fused pattern compiled once at import: one regex-engine entry per
+# line instead of three, with named groups telling us which form matched.
+# Only the repeat keywords are case-insensitive, matching the old behavior.
+_LINE_RE = re.compile(
+    r'(?P<section>\*\*(?P<sname>.+?)\s*–\s*(?P<smin>\d+)\s*minutes?\*\*)'
+    r'|(?P<repeat>(?i:repeat).*?(?P<rcount>\d+)\s*(?i:times))'
+    r'|(?P<interval>\*?\s*(?P<idur>\d+)\s*min\s*@\s*(?P<ispd>\d+(?:\.\d+)?)\s*mph'
+    r'(?:\s*\((?P<idesc>[^)]*)\))?)'
+)
+
+# First characters a matchable line can start with: section/interval bullets,
+# bare durations, or a repeat instruction.
+_CANDIDATE_FIRST_CHARS = frozenset('*-•0123456789Rr')
+
+def parse(text: str) -> List[Interval]:
+    """
+    Parse ChatGPT's workout format into Interval records
+    """
+    if not text or not isinstance(text, str):
+        return []
+
+    intervals = []
+    current_section = None
+    repeat_count = 0
+    repeat_intervals = []
+    in_repeat_block = False
+
+    for line in text.splitlines():
+        # Skip empty lines
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        # Cheap pre-filter: only lines starting with a bullet/digit, or
+        # containing the interval's "@" or a repeat keyword anywhere
+        # ("(Repeat the following 2 times)", "Then repeat 3 times"), can
+        # match at all. Rejects prose with a few byte comparisons instead
+        # of a regex-engine entry.
+        if (stripped[0] not in _CANDIDATE_FIRST_CHARS
+                and '@' not in stripped
+                and 'repeat' not in stripped.lower()):
+            continue
+
+        match = _LINE_RE.search(line)
+        if not match:
+            continue
+
+        # Section headers: **Warm-Up – 5 minutes**
+        if match.group('section') is not None:
+            current_section = match.group('sname').strip()
+            continue
+
+        # Repeat instruction
+        if match.group('repeat') is not None:
+            repeat_count = int(match.group('rcount'))
+            in_repeat_block = True
+            repeat_intervals = []
+            continue
+
+        # Interval lines: * 5 min @ 5.5 mph (description)
+        try:
+            duration = int(match.group('idur'))
+            speed = float(match.group('ispd'))
+
+            # Validate inputs
+            if duration <= 0 or speed <= 0:
+                continue  # Skip invalid intervals
+        except (ValueError, TypeError):
+            continue  # Skip intervals with invalid numbers
+
+        interval = Interval(
+            section=current_section,
+            duration_min=duration,
+            speed_mph=speed,
+            description=match.group('idesc') or ''
+        )
+
+        if in_repeat_block:
+            repeat_intervals.append(interval)
+        else:
+            intervals.append(interval)
+
+    # Materialize the final list in one pass instead of growing
+    # `intervals` in place; the records stay shared, as the old shallow
+    # copies always were.
+    if in_repeat_block and repeat_intervals:
+        return list(chain.from_iterable(
+            [intervals] + [repeat_intervals] * repeat_count))
+
+    return intervals
 
 class WorkoutParser:
-    def __init__(self):
-        self.sections = []
-        self.intervals = []
-    
-    def parse_chatgpt_workout(self, text: str) -> List[Dict]:
-        """
-        Parse ChatGPT's workout format into intervals
-        """
-        if not text or not isinstance(text, str):
-            return []
-            
-        intervals = []
-        current_section = None
-        repeat_count = 0
-        repeat_intervals = []
-        in_repeat_block = False
-        
-        lines = text.split('\n')
-        
-        for line in lines:
-            # Skip empty lines
-            if not line.strip():
-                continue
-            
-            # Check for section headers: **Warm-Up – 5 minutes**
-            section_pattern = r'\*\*(.+?)\s*–\s*(\d+)\s*minutes?\*\*'
-            section_match = re.search(section_pattern, line)
-            
-            if section_match:
-                current_section = section_match.group(1).strip()
-                continue
-            
-            # Check for repeat instruction
-            repeat_pattern = r'Repeat.*?(\d+)\s*times'
-            repeat_match = re.search(repeat_pattern, line, re.IGNORECASE)
-            
-            if repeat_match:
-                repeat_count = int(repeat_match.group(1))
-                in_repeat_block = True
-                repeat_intervals = []
-                continue
-            
-            # Parse interval lines: * 5 min @ 5.5 mph (description)
-            # Make description optional
-            interval_pattern = r'\*?\s*(\d+)\s*min\s*@\s*([\d.]+)\s*mph(?:\s*\((.*?)\))?'
-            interval_match = re.search(interval_pattern, line)
-            
-            if interval_match:
-                try:
-                    duration = int(interval_match.group(1))
-                    speed = float(interval_match.group(2))
-                    
-                    # Validate inputs
-                    if duration <= 0 or speed <= 0:
-                        continue  # Skip invalid intervals
-                except (ValueError, TypeError):
-                    continue  # Skip intervals with invalid numbers
-                
-                interval = {
-                    'section': current_section,
-                    'duration_min': duration,
-                    'speed_mph': speed,
-                    'description': interval_match.group(3) or '',
-                    'incline': 0  # We'll add incline parsing later
-                }
-                
-                if in_repeat_block:
-                    repeat_intervals.append(interval)
-                else:
-                    intervals.append(interval)
-            
-            # Check if we've ended a repeat block
-            # (empty line or new section after repeat_intervals)
-            if in_repeat_block and repeat_intervals and (
-                not line.strip() or section_match
-            ):
-                # Add repeated intervals
-                for _ in range(repeat_count):
-                    intervals.extend(repeat_intervals.copy())
-                in_repeat_block = False
-                repeat_intervals = []
-        
-        # Handle case where repeat block goes to end of file
-        if in_repeat_block and repeat_intervals:
-            for _ in range(repeat_count):
-                intervals.extend(repeat_intervals.copy())
-        
-        return intervals
-
-# Module-level function for backwards compatibility
-def parse(text):
-    return WorkoutParser().parse_chatgpt_workout(text)
\ No newline at end of file
+    """Thin compatibility wrapper around the stateless parse function."""
+
+    def parse_chatgpt_workout(self, text: str) -> List[Interval]:
+        return parse(text)
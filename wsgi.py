@@ -0,0 +1,12 @@
+# wsgi.py — production entry point:
+#   gunicorn -k eventlet -w 4 wsgi:app
+#
+# eventlet.monkey_patch() must run in the main thread before the stdlib is
+# imported anywhere else, and it patches the whole process. That is only
+# safe in a module whose sole purpose is booting the eventlet worker, so it
+# lives here: a plain `import app` (tests, scripts, security_monitor) must
+# never globally patch the interpreter it runs in.
+import eventlet
+eventlet.monkey_patch()
+
+from app import app, socketio  # noqa: E402,F401